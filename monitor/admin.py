@@ -1,17 +1,27 @@
 from django.contrib import admin
-from .models import NetworkInterface, NetworkLog, NetworkStats
+from .models import (
+    AvailabilityDaily, Device, InterfaceRate, NetworkInterface, NetworkLog, NetworkStats, NetworkStatsRollup, Outage,
+    RemediationJob,
+)
+
+
+@admin.register(Device)
+class DeviceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'host', 'port', 'handler', 'enabled']
+    list_filter = ['handler', 'enabled']
+    search_fields = ['name', 'host']
 
 
 @admin.register(NetworkInterface)
 class NetworkInterfaceAdmin(admin.ModelAdmin):
-    list_display = ['interface_name', 'interface_type', 'ip_address', 'status', 'last_checked']
-    list_filter = ['status', 'interface_type']
-    search_fields = ['interface_name', 'ip_address']
+    list_display = ['device', 'interface_name', 'interface_type', 'ip_address', 'status', 'flapping', 'last_changed']
+    list_filter = ['status', 'flapping', 'interface_type', 'device']
+    search_fields = ['device', 'interface_name', 'ip_address']
 
 
 @admin.register(NetworkLog)
 class NetworkLogAdmin(admin.ModelAdmin):
-    list_display = ['timestamp', 'interface_name', 'log_type', 'message', 'resolved']
+    list_display = ['timestamp', 'device', 'interface_name', 'log_type', 'message', 'count', 'last_seen', 'resolved']
     list_filter = ['log_type', 'resolved', 'timestamp']
     search_fields = ['interface_name', 'message']
 
@@ -20,3 +30,37 @@ class NetworkLogAdmin(admin.ModelAdmin):
 class NetworkStatsAdmin(admin.ModelAdmin):
     list_display = ['timestamp', 'total_interfaces', 'interfaces_up', 'interfaces_down', 'uptime_percentage']
     list_filter = ['timestamp']
+
+
+@admin.register(NetworkStatsRollup)
+class NetworkStatsRollupAdmin(admin.ModelAdmin):
+    list_display = ['bucket_start', 'resolution', 'samples', 'uptime_min', 'uptime_avg', 'uptime_max']
+    list_filter = ['resolution', 'bucket_start']
+
+
+@admin.register(InterfaceRate)
+class InterfaceRateAdmin(admin.ModelAdmin):
+    list_display = ['timestamp', 'device', 'interface_name', 'in_bps', 'out_bps', 'errors_per_sec', 'in_utilization']
+    list_filter = ['device', 'timestamp']
+    search_fields = ['device', 'interface_name']
+
+
+@admin.register(RemediationJob)
+class RemediationJobAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'device', 'interface_name', 'status', 'requested_by', 'finished_at']
+    list_filter = ['status', 'device']
+    search_fields = ['interface_name', 'message']
+
+
+@admin.register(Outage)
+class OutageAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'ended_at', 'device', 'interface_name']
+    list_filter = ['started_at', 'device']
+    search_fields = ['device', 'interface_name']
+
+
+@admin.register(AvailabilityDaily)
+class AvailabilityDailyAdmin(admin.ModelAdmin):
+    list_display = ['day', 'device', 'interface_name', 'down_seconds', 'outages', 'repairs']
+    list_filter = ['day', 'device']
+    search_fields = ['device', 'interface_name']
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class MonitorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'monitor'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete
+
+        from . import checks  # noqa: F401 (registers the system checks)
+        from .db import configure_sqlite
+        from .ingest import interface_deleted
+        from .models import NetworkInterface
+        connection_created.connect(configure_sqlite, dispatch_uid='monitor.configure_sqlite')
+        post_delete.connect(interface_deleted, sender=NetworkInterface, dispatch_uid='monitor.interface_deleted')
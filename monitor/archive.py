@@ -0,0 +1,214 @@
+import csv
+import gzip
+import io
+import os
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import InterfaceRate, NetworkLog, NetworkStats
+
+FORMATS = ('csv.gz', 'csv.zst', 'parquet')
+DELETE_BATCH = 500  # ids per DELETE, below every backend's parameter limit
+
+# table name -> (model, columns); every table is partitioned by its timestamp column
+TABLES = {
+    'logs': (NetworkLog, ['id', 'timestamp', 'device', 'interface_name', 'log_type', 'message',
+                          'resolved', 'count', 'last_seen']),
+    'stats': (NetworkStats, ['id', 'timestamp', 'total_interfaces', 'interfaces_up', 'interfaces_down',
+                             'total_errors', 'uptime_percentage']),
+    'rates': (InterfaceRate, ['id', 'timestamp', 'device', 'interface_name', 'in_bps', 'out_bps', 'in_pps',
+                              'out_pps', 'errors_per_sec', 'drops_per_sec', 'in_utilization', 'out_utilization']),
+}
+
+
+def archive_root(root=None) -> Path:
+    return Path(root or settings.ARCHIVE_DIR)
+
+
+def archivable(table: str, cutoff: datetime):
+    """Rows of a table old enough to archive, in (timestamp, id) order"""
+    model, _ = TABLES[table]
+    rows = model.objects.filter(timestamp__lt=cutoff)
+    if table == 'logs':
+        # Unresolved entries are still open: flap entries get coalesced into, errors still await recovery
+        rows = rows.exclude(resolved=False)
+    return rows.order_by('timestamp', 'id')
+
+
+def partition_dir(root: Path, table: str, day: date) -> Path:
+    # Hive-style partition names, so Parquet tools can read the tree as one dataset
+    return root / table / f'date={day.isoformat()}'
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError('zstandard is required for csv.zst archives (pip install zstandard)')
+    return zstandard
+
+
+def _parquet():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError('pyarrow is required for parquet archives (pip install pyarrow)')
+    return pyarrow, pyarrow.parquet
+
+
+def format_value(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def write_part(path: Path, columns: List[str], rows: List[Tuple], file_format: str):
+    """Write rows to path atomically: a reader never sees a partial file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + '.tmp')
+
+    if file_format == 'parquet':
+        pyarrow, parquet = _parquet()
+        table = pyarrow.Table.from_pylist([dict(zip(columns, row)) for row in rows])
+        parquet.write_table(table, temporary, compression='zstd')
+    else:
+        with open(temporary, 'wb') as raw:
+            if file_format == 'csv.zst':
+                compressed = _zstd().ZstdCompressor().stream_writer(raw, closefd=False)
+            else:
+                compressed = gzip.GzipFile(fileobj=raw, mode='wb')
+            with io.TextIOWrapper(compressed, encoding='utf-8', newline='') as text:
+                writer = csv.writer(text)
+                writer.writerow(columns)
+                writer.writerows([format_value(value) for value in row] for row in rows)
+            raw.flush()
+            os.fsync(raw.fileno())
+    os.replace(temporary, path)
+
+
+def archive_table(table: str, cutoff: datetime, root=None, file_format: str = None,
+                  batch_size: int = 10000) -> Dict[str, int]:
+    """Move rows older than cutoff from a table into day-partitioned archive files.
+
+    Rows are read in keyset batches of ``batch_size``; each batch is
+    written as one file per day it spans, and only deleted once its files
+    are safely on disk, so memory stays bounded and an interrupted run
+    loses nothing. A crash between writing and deleting leaves a batch in
+    both places; readers skip the duplicate ids.
+    """
+    file_format = file_format or settings.ARCHIVE_FORMAT
+    if file_format not in FORMATS:
+        raise ValueError(f'Unknown archive format {file_format!r}, use one of {", ".join(FORMATS)}')
+    model, columns = TABLES[table]
+    root = archive_root(root)
+    rows_query = archivable(table, cutoff).values_list(*columns)
+
+    archived = files = 0
+    last = None
+    while True:
+        batch = rows_query
+        if last is not None:
+            batch = batch.filter(Q(timestamp__gt=last[1]) | Q(timestamp=last[1], id__gt=last[0]))
+        batch = list(batch[:batch_size])
+        if not batch:
+            break
+
+        days: Dict[date, List[Tuple]] = {}
+        for row in batch:
+            days.setdefault(row[1].astimezone(dt_timezone.utc).date(), []).append(row)
+        for day, rows in days.items():
+            name = f'{table}-{rows[0][0]}-{rows[-1][0]}.{file_format}'
+            write_part(partition_dir(root, table, day) / name, columns, rows, file_format)
+            files += 1
+
+        ids = [row[0] for row in batch]
+        for start in range(0, len(ids), DELETE_BATCH):
+            model.objects.filter(id__in=ids[start:start + DELETE_BATCH]).delete()
+
+        archived += len(batch)
+        last = batch[-1][:2]
+
+    return {'rows': archived, 'files': files}
+
+
+def read_part(path: Path) -> Iterator[Dict]:
+    """Rows of one archive file, as dicts of strings (CSV) or typed values (Parquet)"""
+    if path.name.endswith('.parquet'):
+        _, parquet = _parquet()
+        yield from parquet.read_table(path).to_pylist()
+        return
+
+    with open(path, 'rb') as raw:
+        if path.name.endswith('.csv.zst'):
+            compressed = _zstd().ZstdDecompressor().stream_reader(raw)
+        else:
+            compressed = gzip.GzipFile(fileobj=raw, mode='rb')
+        with io.TextIOWrapper(compressed, encoding='utf-8', newline='') as text:
+            yield from csv.DictReader(text)
+
+
+def convert_row(model, row: Dict) -> Dict:
+    """Restore field types of an archived row"""
+    converted = {}
+    for name, value in row.items():
+        field = model._meta.get_field(name)
+        if value == '' and field.null:
+            converted[name] = None
+        elif isinstance(value, str):
+            converted[name] = field.to_python(value)
+        else:
+            converted[name] = value
+    return converted
+
+
+def read_archive(table: str, start: datetime, end: datetime, root=None) -> Iterator[Dict]:
+    """Archived rows with start <= timestamp < end, oldest first within each day, one file at a time"""
+    model, _ = TABLES[table]
+    root = archive_root(root)
+    seen = set()
+
+    day = start.astimezone(dt_timezone.utc).date()
+    last_day = end.astimezone(dt_timezone.utc).date()
+    while day <= last_day:
+        directory = partition_dir(root, table, day)
+        if directory.is_dir():
+            parts = [path for path in directory.iterdir() if path.name.endswith(FORMATS)]
+            # Files are named after their first id, and ids grow with time
+            parts.sort(key=lambda path: int(path.name.split('-')[1]))
+            for path in parts:
+                for row in read_part(path):
+                    row = convert_row(model, row)
+                    if row['id'] in seen or not start <= row['timestamp'] < end:
+                        continue
+                    seen.add(row['id'])
+                    yield row
+            seen.clear()
+        day += timedelta(days=1)
+
+
+def archived_series(start: datetime, end: datetime, max_points: int, root=None) -> Dict:
+    """Chart points from archived stats samples, averaged into at most max_points buckets"""
+    step = max((end - start) / max_points, timedelta(seconds=1))
+    buckets: Dict[int, List] = {}
+    for row in read_archive('stats', start, end, root):
+        bucket = buckets.setdefault(int((row['timestamp'] - start) / step), [0, 0.0, 0, 0])
+        bucket[0] += 1
+        bucket[1] += row['uptime_percentage']
+        bucket[2] += row['interfaces_up']
+        bucket[3] += row['interfaces_down']
+
+    labels, uptime, up, down = [], [], [], []
+    for index in sorted(buckets):
+        count, uptime_sum, up_sum, down_sum = buckets[index]
+        labels.append((start + step * index).isoformat())
+        uptime.append(round(uptime_sum / count, 2))
+        up.append(round(up_sum / count, 2))
+        down.append(round(down_sum / count, 2))
+    return {'resolution': 'archive', 'labels': labels, 'uptime': uptime, 'interfaces_up': up, 'interfaces_down': down}
@@ -0,0 +1,208 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Tuple
+
+from django.db.models import Max, Min, Q, Sum
+from django.utils import timezone
+
+from .models import AvailabilityDaily, NetworkInterface, Outage
+
+DAY = timedelta(days=1)
+TOTAL_FIELDS = ['down_seconds', 'outages', 'repairs', 'repair_seconds']
+
+# (device, interface name) -> [down seconds, outages started, outages ended, length of the ended outages]
+Totals = Dict[Tuple[str, str], List[float]]
+
+
+def open_outages(device: str, interface_names: Iterable[str], now: datetime) -> None:
+    """Start an outage for each interface that just went down"""
+    Outage.objects.bulk_create(
+        [Outage(device=device, interface_name=name, started_at=now) for name in interface_names],
+        # An interface already in an outage keeps the one it has
+        ignore_conflicts=True,
+    )
+
+
+def close_outages(device: str, interface_names: Iterable[str], now: datetime) -> None:
+    """End the open outage of each interface that just came back up"""
+    Outage.objects.filter(device=device, interface_name__in=list(interface_names), ended_at__isnull=True).update(
+        ended_at=now,
+    )
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def utc_date(moment: datetime) -> date:
+    return moment.astimezone(dt_timezone.utc).date()
+
+
+def overlapping(start: datetime, end: datetime, **filters):
+    """Outages that overlap [start, end) or end within it, as (device, name, started_at, ended_at)"""
+    return (
+        Outage.objects.filter(started_at__lt=end, **filters)
+        .filter(Q(ended_at__isnull=True) | Q(ended_at__gte=start))
+        .order_by()
+        .values_list('device', 'interface_name', 'started_at', 'ended_at')
+    )
+
+
+def accumulate(totals: Totals, key: Tuple[str, str], started: datetime, ended: datetime,
+               start: datetime, end: datetime, now: datetime) -> None:
+    """Add the part of one outage that falls in [start, end) to totals"""
+    entry = totals.setdefault(key, [0.0, 0, 0, 0.0])
+    entry[0] += max(0.0, (min(ended or now, end) - max(started, start)).total_seconds())
+    if start <= started < end:
+        entry[1] += 1
+    if ended is not None and start <= ended < end:
+        entry[2] += 1
+        entry[3] += (ended - started).total_seconds()
+
+
+def outage_totals(start: datetime, end: datetime, now: datetime, **filters) -> Totals:
+    """Totals per interface over [start, end), straight from the Outage rows"""
+    totals: Totals = {}
+    for device, name, started, ended in overlapping(start, end, **filters):
+        accumulate(totals, (device, name), started, ended, start, end, now)
+    return totals
+
+
+def daily_totals(first: date, last: date, now: datetime) -> Dict[date, Totals]:
+    """Totals per UTC day and interface for the days first..last, from one scan of the Outage rows"""
+    days: Dict[date, Totals] = {}
+    for device, name, started, ended in overlapping(day_start(first), day_start(last) + DAY):
+        day = max(utc_date(started), first)
+        until = min(utc_date(ended or now), last)
+        while day <= until:
+            accumulate(days.setdefault(day, {}), (device, name), started, ended, day_start(day), day_start(day) + DAY, now)
+            day += DAY
+    return days
+
+
+def aggregated_through() -> date:
+    """Last day whose aggregates are final, or None before the first rollup"""
+    return AvailabilityDaily.objects.aggregate(last=Max('day'))['last']
+
+
+def rollup_availability(now: datetime = None) -> int:
+    """Aggregate every completed UTC day not yet aggregated; return rows written.
+
+    Days without outages leave no rows, so a quiet stretch after the
+    last aggregated day is simply scanned again on the next pass.
+    """
+    now = now or timezone.now()
+    last = aggregated_through()
+    if last is not None:
+        first = last + DAY
+    else:
+        earliest = Outage.objects.aggregate(earliest=Min('started_at'))['earliest']
+        if earliest is None:
+            return 0
+        first = utc_date(earliest)
+
+    yesterday = utc_date(now) - DAY
+    if first > yesterday:
+        return 0
+
+    rows = [
+        AvailabilityDaily(device=device, interface_name=name, day=day, **dict(zip(TOTAL_FIELDS, values)))
+        for day, totals in daily_totals(first, yesterday, now).items()
+        for (device, name), values in totals.items()
+    ]
+    if rows:
+        AvailabilityDaily.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['device', 'interface_name', 'day'],
+            update_fields=TOTAL_FIELDS,
+        )
+    return len(rows)
+
+
+def window_totals(start: datetime, end: datetime, now: datetime, **filters) -> Totals:
+    """Totals per interface over [start, end).
+
+    Whole days already aggregated come from AvailabilityDaily; the partial
+    days at either edge and anything not yet aggregated come from the
+    Outage rows, so a month costs one grouped query plus two short scans.
+    """
+    first = utc_date(start) if start == day_start(utc_date(start)) else utc_date(start) + DAY
+    last = aggregated_through()
+    stop = min(utc_date(end), last + DAY) if last is not None else first
+
+    if first >= stop:
+        return outage_totals(start, end, now, **filters)
+
+    totals = outage_totals(start, day_start(first), now, **filters)
+    for key, values in outage_totals(day_start(stop), end, now, **filters).items():
+        entry = totals.setdefault(key, [0.0, 0, 0, 0.0])
+        for index, value in enumerate(values):
+            entry[index] += value
+
+    days = (
+        AvailabilityDaily.objects.filter(day__gte=first, day__lt=stop, **filters)
+        .order_by()
+        .values('device', 'interface_name')
+        .annotate(**{f'total_{field}': Sum(field) for field in TOTAL_FIELDS})
+    )
+    for row in days:
+        entry = totals.setdefault((row['device'], row['interface_name']), [0.0, 0, 0, 0.0])
+        for index, field in enumerate(TOTAL_FIELDS):
+            entry[index] += row[f'total_{field}']
+    return totals
+
+
+def summarize(monitored: float, down: float, outages: int, repairs: int, repair_seconds: float) -> Dict:
+    """Availability (percent), MTTR and MTBF (seconds) from totals; None where nothing was observed"""
+    return {
+        'availability': round(100 * (1 - down / monitored), 3) if monitored else None,
+        'down_seconds': round(down, 1),
+        'outages': outages,
+        'mttr_seconds': round(repair_seconds / repairs, 1) if repairs else None,
+        # Mean time up between the start of one outage and the next
+        'mtbf_seconds': round((monitored - down) / outages, 1) if outages else None,
+    }
+
+
+def availability_report(start: datetime, end: datetime, now: datetime = None,
+                        device: str = None, interface_name: str = None) -> Dict:
+    """Availability, MTTR, MTBF and outage counts of every interface over [start, end), worst first.
+
+    An interface counts as monitored from when it was first seen, and
+    nothing past now is counted.
+    """
+    now = now or timezone.now()
+    end = min(end, now)
+    filters = {}
+    if device is not None:
+        filters['device'] = device
+    if interface_name is not None:
+        filters['interface_name'] = interface_name
+
+    totals = window_totals(start, end, now, **filters) if start < end else {}
+    interfaces = []
+    fleet = [0.0, 0.0, 0, 0, 0.0]
+    for device_name, name, created_at in NetworkInterface.objects.filter(**filters).values_list(
+        'device', 'interface_name', 'created_at',
+    ):
+        monitored = max(0.0, (end - max(start, created_at)).total_seconds())
+        down, outages, repairs, repair_seconds = totals.get((device_name, name), (0.0, 0, 0, 0.0))
+        # Outages from before the interface row was created are not counted against it
+        down = min(down, monitored)
+        for index, value in enumerate((monitored, down, outages, repairs, repair_seconds)):
+            fleet[index] += value
+        interfaces.append({
+            'device': device_name,
+            'interface_name': name,
+            **summarize(monitored, down, outages, repairs, repair_seconds),
+        })
+
+    interfaces.sort(key=lambda row: (
+        row['availability'] if row['availability'] is not None else 101, row['device'], row['interface_name'],
+    ))
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'fleet': summarize(*fleet),
+        'interfaces': interfaces,
+    }
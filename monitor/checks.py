@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .collector import embedded_collector_enabled
+from .events import local_channel_layer
+
+
+@register()
+def check_channel_layer(app_configs, **kwargs):
+    """Live updates from a collector outside the web process need a shared channel layer"""
+    if embedded_collector_enabled() or not local_channel_layer():
+        return []
+    return [Warning(
+        'Live updates will not reach dashboards: the collector runs outside the web process '
+        'but the channel layer is in-memory.',
+        hint='Set REDIS_URL so the collector, syslog listener and web workers share a Redis channel layer.',
+        id='monitor.W001',
+    )]
+
+
+@register()
+def check_embedded_collector(app_configs, **kwargs):
+    """The embedded collector is off with the Redis state store, whatever COLLECTOR_EMBEDDED says"""
+    if not settings.COLLECTOR_EMBEDDED or embedded_collector_enabled():
+        return []
+    return [Warning(
+        'The embedded collector does not run with STATE_STORE=redis: every web worker would poll on its own.',
+        hint='Run python manage.py run_collector as its own process, and set COLLECTOR_EMBEDDED=False.',
+        id='monitor.W002',
+    )]
@@ -1,74 +1,149 @@
 import os
 import random
+import re
 import time
 from datetime import datetime
 from typing import List, Dict
 
+from .metrics import SSH_COMMAND_DURATION, SSH_COMMAND_FAILURES
+from .parsers import InterfaceCounters, parse_ip_interface_brief, parse_show_interfaces
+from .ssh_pool import SSHConnectionPool, get_ssh_pool
+
+# "router>", "router#", "router(config-if)#" at the end of the buffer
+PROMPT_RE = re.compile(r'(?:^|[\r\n])([\w.\-/:@]+(?:\([\w.\-/:]+\))?[>#])\s*$')
+PASSWORD_PROMPT_RE = re.compile(r'[Pp]assword:\s*$')
+IOS_ERROR_RE = re.compile(r'^%\s*(Invalid input|Incomplete command|Ambiguous command|Unknown command).*$', re.MULTILINE)
+LINE_STATUS_RE = re.compile(r' is (administratively down|up|down|deleted)', re.IGNORECASE)
+
+
+class ShellCommandError(Exception):
+    """Raised when the device rejects a command in an interactive shell script"""
+
 
 class CiscoDeviceHandler:
     """Handler for actual Cisco device connections"""
     
-    def __init__(self):
-        self.host = os.getenv('CISCO_HOST', '192.168.1.1')
-        self.username = os.getenv('CISCO_USERNAME', 'admin')
-        self.password = os.getenv('CISCO_PASSWORD', 'cisco')
-        self.enable_password = os.getenv('CISCO_ENABLE_PASSWORD', 'enable')
-        self.connection = None
+    def __init__(self, host: str = None, username: str = None, password: str = None,
+                 enable_password: str = None, port: int = 22, command_timeout: float = None,
+                 pool: SSHConnectionPool = None):
+        # Anything not given explicitly (e.g. by the device inventory) comes from .env
+        self.host = host or os.getenv('CISCO_HOST', '192.168.1.1')
+        self.username = username or os.getenv('CISCO_USERNAME', 'admin')
+        self.password = password or os.getenv('CISCO_PASSWORD', 'cisco')
+        self.enable_password = enable_password or os.getenv('CISCO_ENABLE_PASSWORD', 'enable')
+        self.port = port
+        self.command_timeout = command_timeout or float(os.getenv('CISCO_COMMAND_TIMEOUT', '30'))
+        self.verify_timeout = float(os.getenv('CISCO_VERIFY_TIMEOUT', '10'))
+        self.verify_interval = 0.5
+        self.pool = pool or get_ssh_pool()
+    
+    def session(self):
+        """Borrow a pooled SSH session to this device"""
+        return self.pool.session(self.host, self.username, self.password, self.port)
     
     def connect(self):
-        """Connect to Cisco device via SSH"""
+        """Make sure an authenticated SSH session to the device is available"""
         try:
-            import paramiko
-            
-            self.connection = paramiko.SSHClient()
-            self.connection.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self.connection.connect(
-                hostname=self.host,
-                username=self.username,
-                password=self.password,
-                timeout=10
-            )
-            return True
+            with self.session():
+                return True
         except Exception as e:
             print(f"Connection error: {e}")
             return False
     
     def execute_command(self, command: str) -> str:
-        """Execute command on Cisco device"""
-        if not self.connection:
-            if not self.connect():
-                return ""
-        
+        """Execute command on Cisco device; raises if it still fails after one reconnect"""
+        started = time.perf_counter()
         try:
-            stdin, stdout, stderr = self.connection.exec_command(command)
-            return stdout.read().decode('utf-8')
-        except Exception as e:
-            print(f"Command execution error: {e}")
-            return ""
+            # A pooled session may have been dropped by the device since it was
+            # last used; retry once so a stale session reconnects transparently.
+            for attempt in range(2):
+                try:
+                    with self.session() as client:
+                        stdin, stdout, stderr = client.exec_command(command, timeout=self.command_timeout)
+                        return stdout.read().decode('utf-8')
+                except Exception as e:
+                    if attempt:
+                        print(f"Command execution error: {e}")
+                        SSH_COMMAND_FAILURES.inc(device=self.host)
+                        # An empty answer would read as a device without interfaces
+                        raise
+        finally:
+            SSH_COMMAND_DURATION.observe(time.perf_counter() - started, device=self.host)
+    
+    def _read_until_prompt(self, channel, deadline: float) -> str:
+        """Read from an interactive channel until the device prompt (or a password prompt) appears"""
+        buffer = ''
+        while True:
+            if channel.recv_ready():
+                buffer += channel.recv(65535).decode('utf-8', errors='replace')
+                if PROMPT_RE.search(buffer) or PASSWORD_PROMPT_RE.search(buffer):
+                    return buffer
+                continue
+            if channel.closed or time.monotonic() > deadline:
+                raise TimeoutError(f'No prompt from {self.host} within {self.command_timeout}s')
+            time.sleep(0.01)
+    
+    def execute_script(self, commands: List[str]) -> List[str]:
+        """Run several commands in one interactive shell and return each command's output.
+
+        Unlike execute_command, every command runs in the same IOS session,
+        so mode changes such as ``configure terminal`` carry over to the
+        following commands. Raises ShellCommandError if IOS rejects a command.
+        """
+        deadline = time.monotonic() + self.command_timeout
+        
+        with self.session() as client:
+            channel = client.invoke_shell(width=511, height=0)
+            try:
+                prompt = self._read_until_prompt(channel, deadline)
+                
+                if prompt.rstrip().endswith('>'):
+                    channel.send('enable\n')
+                    if PASSWORD_PROMPT_RE.search(self._read_until_prompt(channel, deadline)):
+                        channel.send(f'{self.enable_password}\n')
+                        if not self._read_until_prompt(channel, deadline).rstrip().endswith('#'):
+                            raise ShellCommandError('Enable password rejected')
+                
+                channel.send('terminal length 0\n')
+                self._read_until_prompt(channel, deadline)
+                
+                outputs = []
+                for command in commands:
+                    channel.send(f'{command}\n')
+                    output = self._read_until_prompt(channel, deadline)
+                    error = IOS_ERROR_RE.search(output)
+                    if error:
+                        raise ShellCommandError(f'{command!r} rejected: {error.group(0).strip()}')
+                    outputs.append(output)
+                return outputs
+            finally:
+                channel.close()
+    
+    def get_interface_status(self, interface_name: str) -> str:
+        """Return the line status of one interface ('up', 'down', 'administratively down')"""
+        output = self.execute_command(f"show interfaces {interface_name}")
+        match = LINE_STATUS_RE.search(output)
+        return match.group(1).lower() if match else ''
+    
+    def wait_for_status(self, interface_name: str, status: str = 'up') -> bool:
+        """Poll an interface until it reaches status or verify_timeout expires"""
+        deadline = time.monotonic() + self.verify_timeout
+        while True:
+            if self.get_interface_status(interface_name) == status:
+                return True
+            if time.monotonic() + self.verify_interval > deadline:
+                return False
+            time.sleep(self.verify_interval)
     
     def get_interfaces(self) -> List[Dict]:
         """Get list of interfaces from Cisco device"""
-        if not self.connect():
-            return []
-        
         output = self.execute_command("show ip interface brief")
-        interfaces = []
-        
-        # Parse output (simplified)
-        lines = output.split('\n')
-        for line in lines[1:]:  # Skip header
-            if line.strip():
-                parts = line.split()
-                if len(parts) >= 6:
-                    interfaces.append({
-                        'name': parts[0],
-                        'ip_address': parts[1] if parts[1] != 'unassigned' else None,
-                        'status': parts[4].lower(),
-                        'protocol': parts[5].lower(),
-                        'type': 'ethernet' if 'Ethernet' in parts[0] else 'other',
-                    })
-        
-        return interfaces
+        return parse_ip_interface_brief(output)
+    
+    def get_counters(self) -> List[InterfaceCounters]:
+        """Get cumulative traffic and error counters from Cisco device"""
+        output = self.execute_command("show interfaces")
+        return parse_show_interfaces(output)
     
     def fix_interface(self, interface_name: str) -> Dict:
         """Attempt to fix a down interface"""
@@ -81,21 +156,18 @@ class CiscoDeviceHandler:
         
         # Try to bring up the interface
         commands = [
-            f"configure terminal",
+            "configure terminal",
             f"interface {interface_name}",
             "no shutdown",
             "end"
         ]
         
         try:
-            for cmd in commands:
-                self.execute_command(cmd)
+            # One shell session, so the config context survives between commands
+            self.execute_script(commands)
             
-            # Wait and check status
-            time.sleep(2)
-            output = self.execute_command(f"show interface {interface_name}")
-            
-            if 'up' in output.lower():
+            # Poll until the interface comes up instead of sleeping a fixed time
+            if self.wait_for_status(interface_name, 'up'):
                 return {
                     'success': True,
                     'message': f'Interface {interface_name} brought up successfully',
@@ -115,9 +187,8 @@ class CiscoDeviceHandler:
             }
     
     def disconnect(self):
-        """Close connection to device"""
-        if self.connection:
-            self.connection.close()
+        """Close pooled connections to device"""
+        self.pool.close_host(self.host, self.username, self.password, self.port)
 
 
 class SimulationHandler:
@@ -135,9 +206,14 @@ class SimulationHandler:
         {'name': 'GLOBE', 'type': 'serial', 'base_ip': '172.16.0.2'},
     ]
     
+    # Bandwidth reported for simulated links, in Kbit/sec
+    BANDWIDTH_KBPS = {'ethernet': 1000000, 'serial': 1544}
+    
     # Class-level state (shared across instances)
     _interface_states = {}
     _last_check = 0
+    _counters = {}
+    _counters_at = 0
     
     def __init__(self):
         self.failure_probability = 0.10  # 10% chance of failure per check (increased from 5%)
@@ -209,6 +285,49 @@ class SimulationHandler:
         
         return interfaces
     
+    def get_counters(self) -> List[InterfaceCounters]:
+        """Get simulated cumulative counters, advanced by random traffic since the last call"""
+        current_time = time.time()
+        elapsed = current_time - SimulationHandler._counters_at if SimulationHandler._counters_at else 0
+        SimulationHandler._counters_at = current_time
+        
+        records = []
+        for interface in self.INTERFACES:
+            interface_name = interface['name']
+            bandwidth = self.BANDWIDTH_KBPS.get(interface['type'], 100000)
+            counters = SimulationHandler._counters.setdefault(interface_name, dict.fromkeys(
+                ['in_octets', 'out_octets', 'in_packets', 'out_packets', 'in_errors', 'crc_errors', 'in_drops', 'out_drops'], 0))
+            state = SimulationHandler._interface_states.get(interface_name, {'status': 'up'})
+            
+            # Down links carry no traffic; up links run at 1-40% of bandwidth
+            if state['status'] == 'up' and elapsed:
+                for direction in ('in', 'out'):
+                    octets = int(bandwidth * 1000 / 8 * random.uniform(0.01, 0.4) * elapsed)
+                    counters[f'{direction}_octets'] += octets
+                    counters[f'{direction}_packets'] += octets // 600
+                if random.random() < 0.1:
+                    crc = random.randint(1, 20)
+                    counters['crc_errors'] += crc
+                    counters['in_errors'] += crc
+                    counters['in_drops'] += random.randint(0, 5)
+            
+            records.append(InterfaceCounters(
+                name=interface_name,
+                status=state['status'],
+                protocol=state['status'],
+                description='',
+                mtu=1500,
+                bandwidth_kbps=bandwidth,
+                out_errors=0,
+                in_rate_bps=0,
+                out_rate_bps=0,
+                in_rate_pps=0,
+                out_rate_pps=0,
+                **counters,
+            ))
+        
+        return records
+    
     def fix_interface(self, interface_name: str) -> Dict:
         """Simulate fixing an interface"""
         if interface_name not in SimulationHandler._interface_states:
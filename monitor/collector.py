@@ -0,0 +1,236 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .availability import rollup_availability
+from .cisco_handler import CiscoDeviceHandler, SimulationHandler
+from .counters import RateCalculator
+from .fleet import FleetDeviceHandler, fleet_handlers, get_fleet
+from .ingest import ingest_interfaces
+from .inventory import load_inventory_file
+from .metrics import POLL_FAILURES, SWEEP_DURATION, SWEEP_LAST_SUCCESS
+from .models import Device
+from .poller import PollResult, poll_devices
+from .snmp import SNMP_PORT, SnmpHandler, apoll_snmp_devices
+from .timeseries import prune, record_rates, record_sample, rollup_all
+
+
+def get_handler(device: Device = None):
+    """Return the handler for an inventory device, or for the configured MODE"""
+    if device is None:
+        mode = os.getenv('MODE', 'simulation')
+
+        if mode == 'device':
+            return CiscoDeviceHandler()
+        return SimulationHandler()
+
+    if device.handler == 'simulation':
+        return SimulationHandler()
+    if device.handler == 'snmp':
+        return SnmpHandler(
+            host=device.host,
+            # port keeps its SSH default unless set explicitly for the device
+            port=device.port if device.port != 22 else SNMP_PORT,
+            community=device.snmp_community or None,
+        )
+    return CiscoDeviceHandler(
+        host=device.host,
+        port=device.port,
+        username=device.username or None,
+        password=device.password or None,
+        enable_password=device.enable_password or None,
+        command_timeout=settings.POLLER_DEVICE_TIMEOUT,
+    )
+
+
+def get_simulated_fleet():
+    """The synthetic fleet, when MODE=simulation and SIMULATION_DEVICES is set"""
+    if os.getenv('MODE', 'simulation') != 'simulation':
+        return None
+    return get_fleet()
+
+
+def get_named_handler(name: str):
+    """Return the handler for a device as the snapshot names it, or None if unknown"""
+    if not name:
+        return get_handler()
+
+    device = Device.objects.filter(name=name).first()
+    if device is not None:
+        return get_handler(device)
+
+    fleet = get_simulated_fleet()
+    index = fleet.device_index(name) if fleet is not None else None
+    if index is None:
+        return None
+    return FleetDeviceHandler(fleet, index)
+
+
+def poll_handler(handler):
+    """Read interface state, plus counters from handlers that provide them"""
+    interfaces = handler.get_interfaces()
+    counters = None
+    if hasattr(handler, 'get_counters'):
+        try:
+            counters = (handler.get_counters(), time.time())
+        except Exception as e:
+            print(f"[COLLECTOR] Could not read counters: {e}")
+    return interfaces, counters
+
+
+class Collector:
+    """Polls devices on a fixed schedule and writes the results to the database.
+
+    The database rows are the shared snapshot: views only read them, so
+    request latency no longer depends on the device and the number of
+    open dashboards no longer multiplies the SSH logins.
+
+    When the Device inventory is empty the collector polls the single
+    device configured by MODE/CISCO_HOST, as before.
+    """
+
+    def __init__(self, handler=None, interval: float = None):
+        self.handler = handler
+        self.interval = interval if interval is not None else settings.COLLECTOR_INTERVAL
+        self._stop_event = threading.Event()
+        self._last_stats_sample = None
+        self.rates = RateCalculator()
+
+    def get_handlers(self) -> Dict[str, object]:
+        """Map device name to handler for this sweep"""
+        if self.handler is not None:
+            return {'': self.handler}
+
+        devices = list(Device.objects.filter(enabled=True))
+        if not devices:
+            fleet = get_simulated_fleet()
+            if fleet is not None:
+                return fleet_handlers(fleet)
+            return {'': get_handler()}
+        return {device.name: get_handler(device) for device in devices}
+
+    def sweep(self) -> Dict[str, PollResult]:
+        """Poll every device concurrently and ingest what came back"""
+        started = time.monotonic()
+        handlers = self.get_handlers()
+        snmp_handlers = {name: handler for name, handler in handlers.items() if isinstance(handler, SnmpHandler)}
+
+        results = asyncio.run(self.poll_all(
+            {name: handler for name, handler in handlers.items() if name not in snmp_handlers},
+            snmp_handlers,
+        ))
+
+        for name, result in results.items():
+            if result.ok:
+                ingest_interfaces(result.interfaces, device=name)
+            else:
+                print(f"[COLLECTOR] Polling {name or 'device'} failed: {result.error}")
+                POLL_FAILURES.inc(device=name)
+
+        counters = {name: result.counters for name, result in results.items() if result.counters}
+        if counters:
+            record_rates(self.rates.update(counters))
+
+        SWEEP_DURATION.observe(time.monotonic() - started)
+        # Left alone when every poll failed, so alerts on its age catch a collector that sees nothing
+        if any(result.ok for result in results.values()):
+            SWEEP_LAST_SUCCESS.set(time.time())
+        return results
+
+    async def poll_all(self, threaded: Dict[str, object], snmp_handlers: Dict[str, SnmpHandler]) -> Dict[str, PollResult]:
+        """Poll SNMP devices natively on the event loop while SSH and simulated ones run on worker threads"""
+        results, snmp_results = await asyncio.gather(
+            asyncio.to_thread(
+                poll_devices,
+                threaded,
+                max_workers=settings.POLLER_MAX_WORKERS,
+                timeout=settings.POLLER_DEVICE_TIMEOUT,
+                poll=poll_handler,
+            ),
+            apoll_snmp_devices(snmp_handlers, timeout=settings.POLLER_DEVICE_TIMEOUT),
+        )
+        results.update(snmp_results)
+        return results
+
+    def record_stats(self):
+        """Take a stats sample every STATS_SAMPLE_INTERVAL and maintain the rollup tiers"""
+        now = time.monotonic()
+        if self._last_stats_sample is not None and now - self._last_stats_sample < settings.STATS_SAMPLE_INTERVAL:
+            return
+
+        self._last_stats_sample = now
+        record_sample()
+        rollup_all()
+        rollup_availability()
+        prune()
+
+    def load_inventory(self):
+        """Sync the Device table from MONITOR_INVENTORY_FILE before the first sweep"""
+        try:
+            load_inventory_file()
+        except Exception as e:
+            print(f"[COLLECTOR] Could not load inventory: {e}")
+
+    def run_forever(self):
+        """Sweep every `interval` seconds until stop() is called"""
+        self.load_inventory()
+
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            close_old_connections()
+            try:
+                self.sweep()
+                self.record_stats()
+            except Exception as e:
+                print(f"[COLLECTOR] Sweep failed: {e}")
+            finally:
+                close_old_connections()
+
+            elapsed = time.monotonic() - started
+            self._stop_event.wait(max(0.0, self.interval - elapsed))
+
+    def stop(self):
+        """Ask the polling loop to exit after the current sweep"""
+        self._stop_event.set()
+
+
+_embedded_collector = None
+_embedded_lock = threading.Lock()
+
+
+def embedded_collector_enabled() -> bool:
+    """COLLECTOR_EMBEDDED, except with the Redis state store, which several workers share"""
+    return settings.COLLECTOR_EMBEDDED and settings.STATE_STORE != 'redis'
+
+
+def ensure_embedded_collector():
+    """Start the in-process collector thread once, if enabled in settings.
+
+    Used for single-process setups (``runserver``); deployments with
+    several workers should set COLLECTOR_EMBEDDED=False and run
+    ``python manage.py run_collector`` instead. With the Redis state
+    store it never starts: each worker would poll, and simulate the
+    network, on its own.
+    """
+    global _embedded_collector
+
+    if not embedded_collector_enabled() or _embedded_collector is not None:
+        return _embedded_collector
+
+    with _embedded_lock:
+        if _embedded_collector is None:
+            collector = Collector()
+            thread = threading.Thread(
+                target=collector.run_forever,
+                name='monitor-collector',
+                daemon=True,
+            )
+            thread.start()
+            _embedded_collector = collector
+
+    return _embedded_collector
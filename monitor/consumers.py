@@ -0,0 +1,25 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .events import DASHBOARD_GROUP
+
+
+class DashboardConsumer(AsyncJsonWebsocketConsumer):
+    """Pushes interface transitions, new logs and counters to the dashboard"""
+
+    async def connect(self):
+        session = self.scope.get('session')
+        authenticated = session is not None and await database_sync_to_async(session.get)('authenticated', False)
+
+        if not authenticated:
+            await self.close(code=4401)
+            return
+
+        await self.channel_layer.group_add(DASHBOARD_GROUP, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        await self.channel_layer.group_discard(DASHBOARD_GROUP, self.channel_name)
+
+    async def dashboard_event(self, message):
+        await self.send_json({'event': message['event'], 'data': message['data']})
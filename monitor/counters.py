@@ -0,0 +1,138 @@
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .parsers import InterfaceCounters
+
+# Cumulative counters tracked per interface, in matrix column order
+COUNTER_FIELDS = [
+    'in_octets', 'out_octets', 'in_packets', 'out_packets',
+    'in_errors', 'crc_errors', 'out_errors', 'in_drops', 'out_drops',
+]
+OCTETS, PACKETS = slice(0, 2), slice(2, 4)
+ERRORS, DROPS = [4, 6], [7, 8]
+
+WRAP_32 = np.uint64(0xFFFFFFFF)
+# A decrease that only makes sense as a wrap of more than half the counter
+# range is a reset (clear counters, reload) rather than a wrap
+HALF_32 = np.uint64(1 << 31)
+HALF_64 = np.uint64(1 << 63)
+
+Key = Tuple[str, str]
+
+
+class Rates:
+    """Per-second rates for the interfaces seen in two consecutive polls"""
+
+    def __init__(self, keys: List[Key], values: np.ndarray, utilization: np.ndarray):
+        self.keys = keys
+        self.values = values  # columns: in/out bps, in/out pps, errors/s, drops/s
+        self.utilization = utilization  # columns: in/out percent of bandwidth
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rows(self) -> Iterable[Dict]:
+        for (device, name), values, utilization in zip(self.keys, self.values.tolist(), self.utilization.tolist()):
+            yield {
+                'device': device,
+                'interface_name': name,
+                'in_bps': values[0],
+                'out_bps': values[1],
+                'in_pps': values[2],
+                'out_pps': values[3],
+                'errors_per_sec': values[4],
+                'drops_per_sec': values[5],
+                'in_utilization': utilization[0],
+                'out_utilization': utilization[1],
+            }
+
+
+def counter_deltas(previous: np.ndarray, current: np.ndarray) -> np.ndarray:
+    """Increase between two uint64 counter matrices, allowing for wraps and resets.
+
+    uint64 subtraction already wraps modulo 2**64. When both readings fit
+    in 32 bits the counter is treated as a Counter32 and the delta is
+    taken modulo 2**32. A decrease larger than half the counter range is
+    a reset, and the current reading is the increase since it.
+    """
+    with np.errstate(over='ignore'):
+        delta = current - previous
+
+    decreased = current < previous
+    is_32bit = (previous <= WRAP_32) & (current <= WRAP_32)
+    delta = np.where(decreased & is_32bit, delta & WRAP_32, delta)
+
+    reset = decreased & np.where(is_32bit, delta > HALF_32, delta > HALF_64)
+    return np.where(reset, current, delta)
+
+
+class RateCalculator:
+    """Turns successive counter polls into rates for all interfaces at once.
+
+    The previous reading of every interface is kept as one uint64 matrix,
+    so a sweep costs a handful of array operations however many ports are
+    polled. Interfaces seen for the first time only set a baseline.
+    """
+
+    def __init__(self):
+        self.index: Dict[Key, int] = {}
+        self.counters = np.zeros((0, len(COUNTER_FIELDS)), dtype=np.uint64)
+        self.polled_at = np.zeros(0, dtype=np.float64)
+
+    def update(self, polls: Dict[str, Tuple[List[InterfaceCounters], float]]) -> Rates:
+        """Feed {device: (counters, poll time)} and return rates against the previous poll"""
+        keys: List[Key] = []
+        rows: List[List[int]] = []
+        bandwidth: List[int] = []
+        polled_at: List[float] = []
+
+        for device, (records, timestamp) in polls.items():
+            for record in records:
+                keys.append((device, record.name))
+                rows.append([getattr(record, field) for field in COUNTER_FIELDS])
+                bandwidth.append(record.bandwidth_kbps)
+                polled_at.append(timestamp)
+
+        current = np.array(rows, dtype=np.uint64).reshape(len(rows), len(COUNTER_FIELDS))
+        now = np.array(polled_at, dtype=np.float64)
+
+        previous_rows = np.array([self.index.get(key, -1) for key in keys], dtype=np.intp)
+        seen = previous_rows >= 0
+        baseline = np.full(len(keys), np.inf)
+        baseline[seen] = self.polled_at[previous_rows[seen]]
+        # A reading no newer than the baseline (a repeated poll) cannot give a rate
+        known = now > baseline
+        rates = self._rates(current[known], now[known], previous_rows[known],
+                            np.array(bandwidth, dtype=np.float64)[known])
+        rate_keys = [key for key, seen in zip(keys, known.tolist()) if seen]
+
+        # Devices missing from this poll keep their previous reading
+        carried = [(key, row) for key, row in self.index.items() if key[0] not in polls]
+        self.index = {key: row for row, key in enumerate(keys)}
+        if carried:
+            self.index.update({key: len(keys) + i for i, (key, _) in enumerate(carried)})
+            carried_rows = np.array([row for _, row in carried], dtype=np.intp)
+            current = np.vstack([current, self.counters[carried_rows]])
+            now = np.concatenate([now, self.polled_at[carried_rows]])
+        self.counters = current
+        self.polled_at = now
+
+        return Rates(rate_keys, *rates)
+
+    def _rates(self, current: np.ndarray, now: np.ndarray, previous_rows: np.ndarray,
+               bandwidth_kbps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        elapsed = (now - self.polled_at[previous_rows])[:, None]
+        per_second = counter_deltas(self.counters[previous_rows], current).astype(np.float64) / elapsed
+
+        values = np.column_stack([
+            per_second[:, OCTETS] * 8,
+            per_second[:, PACKETS],
+            per_second[:, ERRORS].sum(axis=1),
+            per_second[:, DROPS].sum(axis=1),
+        ])
+
+        capacity = (bandwidth_kbps * 1000)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            utilization = np.where(capacity > 0, values[:, 0:2] / capacity * 100, 0.0)
+        return values, np.minimum(utilization, 100.0)
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from django.conf import settings
+
+from .models import NetworkInterface, NetworkLog
+
+# Message of the single log entry that collects every transition of a flapping interface
+FLAP_MESSAGE = 'Interface is flapping'
+
+
+def decayed_penalty(interface: NetworkInterface, now: datetime) -> float:
+    """Flap penalty of interface at now, decayed exponentially since it was last updated"""
+    if not interface.flap_penalty or interface.penalty_updated is None:
+        return interface.flap_penalty
+    elapsed = max(0.0, (now - interface.penalty_updated).total_seconds())
+    return interface.flap_penalty * 0.5 ** (elapsed / settings.FLAP_HALF_LIFE)
+
+
+def record_transition(interface: NetworkInterface, now: datetime) -> bool:
+    """Charge one status transition, as in BGP route-flap dampening.
+
+    Each transition adds FLAP_PENALTY to the decayed penalty (capped at
+    FLAP_MAX_PENALTY). The interface is flagged flapping once the penalty
+    exceeds FLAP_SUPPRESS. Returns True when this transition starts a flap.
+    """
+    penalty = min(decayed_penalty(interface, now) + settings.FLAP_PENALTY, settings.FLAP_MAX_PENALTY)
+    interface.flap_penalty = penalty
+    interface.penalty_updated = now
+
+    if not interface.flapping and penalty > settings.FLAP_SUPPRESS:
+        interface.flapping = True
+        return True
+    return False
+
+
+def settle(interface: NetworkInterface, now: datetime) -> bool:
+    """Clear the flapping flag once the penalty has decayed below FLAP_REUSE; True if cleared"""
+    if not interface.flapping:
+        return False
+
+    penalty = decayed_penalty(interface, now)
+    if penalty >= settings.FLAP_REUSE:
+        return False
+
+    interface.flapping = False
+    interface.flap_penalty = penalty
+    interface.penalty_updated = now
+    return True
+
+
+def flap_log(device: str, interface_name: str, now: datetime) -> NetworkLog:
+    """Build (without saving) the entry that the transitions of a flap are coalesced into"""
+    return NetworkLog(
+        device=device,
+        interface_name=interface_name,
+        log_type='warning',
+        message=FLAP_MESSAGE,
+        timestamp=now,
+        last_seen=now,
+        resolved=False,
+    )
+
+
+def settled_log(device: str, interface_name: str, status: str) -> NetworkLog:
+    """Build (without saving) the entry written when an interface stops flapping"""
+    return NetworkLog(
+        device=device,
+        interface_name=interface_name,
+        log_type='info',
+        message=f'Interface stopped flapping, now {status.upper()}',
+        resolved=True,
+    )
+
+
+def open_flap_logs(device: str, interface_names):
+    """The unresolved flap entries of the given interfaces"""
+    return NetworkLog.objects.filter(
+        device=device,
+        interface_name__in=interface_names,
+        log_type='warning',
+        message=FLAP_MESSAGE,
+        resolved=False,
+    )
@@ -0,0 +1,13 @@
+def configure_sqlite(sender, connection, **kwargs):
+    """Put file-backed SQLite databases in WAL mode on every new connection.
+
+    WAL lets dashboard readers run while the collector writes; only
+    writers still take turns. synchronous=NORMAL is durable in WAL mode
+    and avoids an fsync per commit.
+    """
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
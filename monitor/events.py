@@ -0,0 +1,56 @@
+from typing import Iterable, Tuple
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .models import NetworkInterface, NetworkLog
+from .serializers import serialize_interface, serialize_log
+from .stats import get_counters, invalidate_counters
+
+# Channel layer group every open dashboard joins
+DASHBOARD_GROUP = 'dashboard'
+
+
+def local_channel_layer() -> bool:
+    """True when the channel layer only reaches dashboards served by this process"""
+    return settings.CHANNEL_LAYERS['default']['BACKEND'] == 'channels.layers.InMemoryChannelLayer'
+
+
+def publish(event: str, data) -> None:
+    """Push an event to all connected dashboards; never fails the caller"""
+    layer = get_channel_layer()
+    if layer is None:
+        return
+
+    try:
+        async_to_sync(layer.group_send)(DASHBOARD_GROUP, {
+            'type': 'dashboard.event',
+            'event': event,
+            'data': data,
+        })
+    except Exception as e:
+        print(f"[EVENTS] Could not publish {event}: {e}")
+
+
+def publish_changes(interfaces: Iterable[NetworkInterface] = (), logs: Iterable[NetworkLog] = ()) -> None:
+    """Invalidate cached counters, then push changed interfaces, new logs and the new counters"""
+    interfaces = [serialize_interface(interface) for interface in interfaces]
+    logs = [serialize_log(log) for log in logs if log.pk is not None]
+
+    if not interfaces and not logs:
+        return
+
+    invalidate_counters()
+    if interfaces:
+        publish('interfaces', interfaces)
+    if logs:
+        publish('logs', logs)
+    publish('stats', get_counters())
+
+
+def publish_deletions(keys: Iterable[Tuple[str, str]]) -> None:
+    """Invalidate cached counters, then tell dashboards which (device, name) interfaces are gone"""
+    invalidate_counters()
+    publish('interfaces_deleted', [{'device': device, 'name': name} for device, name in keys])
+    publish('stats', get_counters())
@@ -0,0 +1,302 @@
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .counters import COUNTER_FIELDS
+from .parsers import InterfaceCounters
+
+DISTRIBUTIONS = ('exponential', 'lognormal', 'fixed')
+
+# Link speeds in Kbit/sec: access ports, plus a few uplinks per device
+ACCESS_KBPS = 1000000
+UPLINK_KBPS = 10000000
+UPLINKS_PER_DEVICE = 2
+
+
+def draw_durations(rng: np.random.Generator, distribution: str, mean: float, sigma: float, size: int) -> np.ndarray:
+    """Draw `size` durations (seconds) with the given mean from a named distribution"""
+    if distribution == 'exponential':
+        return rng.exponential(mean, size)
+    if distribution == 'lognormal':
+        # mu chosen so that the distribution's mean (not its median) is `mean`
+        return rng.lognormal(np.log(mean) - sigma ** 2 / 2, sigma, size)
+    if distribution == 'fixed':
+        return np.full(size, float(mean))
+    raise ValueError(f'Unknown distribution {distribution!r}, use one of {", ".join(DISTRIBUTIONS)}')
+
+
+class FleetSimulation:
+    """A synthetic fleet of devices whose interfaces fail and recover over time.
+
+    State lives in flat NumPy arrays indexed by interface (device-major),
+    so advancing a few hundred thousand interfaces is a handful of
+    vectorized operations. Every interface and every device alternates
+    between up and down: time to failure follows ``failure_distribution``
+    with mean ``interface_mtbf`` / ``device_mtbf``, and time to repair
+    follows ``repair_distribution`` with mean ``interface_mttr`` /
+    ``device_mttr``. A down device takes all of its interfaces down with it.
+
+    The fleet runs on the clock passed to ``advance``; the same seed and
+    the same sequence of times always produce the same states.
+    """
+
+    def __init__(self, devices: int, interfaces_per_device: int, seed: int = 0,
+                 interface_mtbf: float = 3600, interface_mttr: float = 120,
+                 device_mtbf: float = 86400, device_mttr: float = 600,
+                 failure_distribution: str = 'exponential', repair_distribution: str = 'exponential',
+                 sigma: float = 1.0, step: float = 1.0, start: float = None):
+        for distribution in (failure_distribution, repair_distribution):
+            if distribution not in DISTRIBUTIONS:
+                raise ValueError(f'Unknown distribution {distribution!r}, use one of {", ".join(DISTRIBUTIONS)}')
+
+        self.devices = devices
+        self.interfaces_per_device = interfaces_per_device
+        self.interface_mtbf = interface_mtbf
+        self.interface_mttr = interface_mttr
+        self.device_mtbf = device_mtbf
+        self.device_mttr = device_mttr
+        self.failure_distribution = failure_distribution
+        self.repair_distribution = repair_distribution
+        self.sigma = sigma  # Shape of lognormal durations
+        self.step = step
+        self.now = time.time() if start is None else start
+        self.rng = np.random.default_rng(seed)
+        self.transitions = 0
+        self._lock = threading.Lock()
+
+        size = devices * interfaces_per_device
+        self.device_of = np.repeat(np.arange(devices), interfaces_per_device)
+
+        # Everything starts up, with its first failure already scheduled
+        self.down = np.zeros(size, dtype=bool)
+        self.next_change = self.now + self._draw(failure_distribution, interface_mtbf, size)
+        self.changed_at = np.full(size, self.now)
+        self.down_count = np.zeros(size, dtype=np.uint32)
+        self.device_down = np.zeros(devices, dtype=bool)
+        self.device_next_change = self.now + self._draw(failure_distribution, device_mtbf, devices)
+        self.device_changed_at = np.full(devices, self.now)
+
+        uplinks = min(UPLINKS_PER_DEVICE, interfaces_per_device)
+        self.names = [f'GigabitEthernet1/0/{port + 1}' for port in range(interfaces_per_device - uplinks)]
+        self.names += [f'TenGigabitEthernet1/1/{port + 1}' for port in range(uplinks)]
+        self.index = {name: port for port, name in enumerate(self.names)}
+        self.bandwidth_kbps = np.tile(
+            np.array([ACCESS_KBPS] * (interfaces_per_device - uplinks) + [UPLINK_KBPS] * uplinks, dtype=np.float64),
+            devices,
+        )
+        self.counters = np.zeros((size, len(COUNTER_FIELDS)), dtype=np.uint64)
+
+    def device_name(self, device: int) -> str:
+        return f'sim-{device:0{max(4, len(str(self.devices - 1)))}d}'
+
+    def device_index(self, name: str) -> int:
+        """Index of a device by its name, or None if the fleet has no such device"""
+        prefix, _, number = name.partition('-')
+        if prefix != 'sim' or not number.isdigit() or int(number) >= self.devices:
+            return None
+        return int(number) if self.device_name(int(number)) == name else None
+
+    def status(self) -> np.ndarray:
+        """Effective status per interface: down if the interface or its device is down"""
+        return self.down | self.device_down[self.device_of]
+
+    def _draw(self, distribution: str, mean: float, size: int) -> np.ndarray:
+        return draw_durations(self.rng, distribution, mean, self.sigma, size)
+
+    def _schedule(self, down: np.ndarray, due: np.ndarray, at: np.ndarray,
+                  mtbf: float, mttr: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Flip the due entries of `down` at times `at`; returns their next change times and which went down"""
+        went_down = ~down[due]
+        down[due] = went_down
+        durations = np.where(
+            went_down,
+            self._draw(self.repair_distribution, mttr, len(at)),
+            self._draw(self.failure_distribution, mtbf, len(at)),
+        )
+        return at + durations, went_down
+
+    def advance(self, now: float = None) -> int:
+        """Apply every failure and recovery due up to now; returns the number of status changes.
+
+        Calls less than ``step`` seconds after the last advance are no-ops,
+        so the handlers of one sweep all see the same fleet state.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if now - self.now < self.step:
+                return 0
+
+            elapsed = now - self.now
+            before = self.status()
+
+            # A long gap may hold several changes per entry; repeat until none is due
+            while True:
+                due = np.flatnonzero(self.device_next_change <= now)
+                if not len(due):
+                    break
+                at = self.device_next_change[due]
+                self.device_next_change[due], _ = self._schedule(self.device_down, due, at, self.device_mtbf, self.device_mttr)
+                self.device_changed_at[due] = at
+
+            while True:
+                due = np.flatnonzero(self.next_change <= now)
+                if not len(due):
+                    break
+                at = self.next_change[due]
+                self.next_change[due], went_down = self._schedule(self.down, due, at, self.interface_mtbf, self.interface_mttr)
+                self.changed_at[due] = at
+                self.down_count[due[went_down]] += 1
+
+            self._add_traffic(before, elapsed)
+            self.now = now
+            changes = int(np.count_nonzero(before != self.status()))
+            self.transitions += changes
+            return changes
+
+    def _add_traffic(self, down: np.ndarray, elapsed: float):
+        """Advance the counters of interfaces that were up: 1-40% utilization, occasional CRC errors"""
+        up = np.flatnonzero(~down)
+        if not len(up):
+            return
+
+        octets = (self.bandwidth_kbps[up, None] * 1000 / 8 * elapsed
+                  * self.rng.uniform(0.01, 0.4, (len(up), 2))).astype(np.uint64)
+        crc = self.rng.poisson(0.01 * elapsed, len(up)).astype(np.uint64)
+        drops = self.rng.poisson(0.002 * elapsed, len(up)).astype(np.uint64)
+
+        self.counters[up, 0:2] += octets
+        self.counters[up, 2:4] += octets // np.uint64(600)
+        self.counters[up, 4] += crc
+        self.counters[up, 5] += crc
+        self.counters[up, 7] += drops
+
+    def _slice(self, device: int) -> slice:
+        start = device * self.interfaces_per_device
+        return slice(start, start + self.interfaces_per_device)
+
+    def get_interfaces(self, device: int) -> List[Dict]:
+        """Interface records of one device, as a handler's get_interfaces() returns them"""
+        with self._lock:
+            rows = self._slice(device)
+            down = (self.down[rows] | self.device_down[device]).tolist()
+            since = np.maximum(self.changed_at[rows], self.device_changed_at[device])
+            time_in_state = (self.now - since).astype(np.int64).tolist()
+            down_count = self.down_count[rows].tolist()
+
+        return [
+            {
+                'name': name,
+                'type': 'ethernet',
+                'ip_address': f'10.{device >> 8 & 255}.{device & 255}.{port + 1}' if port < 254 else None,
+                'status': 'down' if down[port] else 'up',
+                'protocol': 'down' if down[port] else 'up',
+                'down_count': down_count[port],
+                'time_in_state': time_in_state[port],
+            }
+            for port, name in enumerate(self.names)
+        ]
+
+    def get_counters(self, device: int) -> List[InterfaceCounters]:
+        """Cumulative counters of one device's interfaces"""
+        with self._lock:
+            rows = self._slice(device)
+            down = (self.down[rows] | self.device_down[device]).tolist()
+            counters = self.counters[rows].tolist()
+            bandwidth = self.bandwidth_kbps[rows].astype(np.int64).tolist()
+
+        records = []
+        for port, name in enumerate(self.names):
+            status = 'down' if down[port] else 'up'
+            records.append(InterfaceCounters(
+                name=name,
+                status=status,
+                protocol=status,
+                description='',
+                mtu=1500,
+                bandwidth_kbps=bandwidth[port],
+                in_rate_bps=0,
+                out_rate_bps=0,
+                in_rate_pps=0,
+                out_rate_pps=0,
+                **dict(zip(COUNTER_FIELDS, counters[port])),
+            ))
+        return records
+
+    def fix_interface(self, device: int, interface_name: str) -> Dict:
+        """Bring a down interface back up, unless its whole device is down"""
+        port = self.index.get(interface_name)
+        if port is None:
+            return {'success': False, 'message': f'Interface {interface_name} not found', 'requires_manual_intervention': False}
+
+        with self._lock:
+            if self.device_down[device]:
+                return {
+                    'success': False,
+                    'message': f'{self.device_name(device)} is down; {interface_name} cannot be brought up (simulated)',
+                    'requires_manual_intervention': True,
+                }
+            row = self._slice(device).start + port
+            if self.down[row]:
+                self.down[row] = False
+                self.changed_at[row] = self.now
+                self.next_change[row] = self.now + self._draw(self.failure_distribution, self.interface_mtbf, 1)[0]
+
+        return {
+            'success': True,
+            'message': f'Interface {interface_name} brought up successfully (simulated)',
+            'requires_manual_intervention': False,
+        }
+
+
+class FleetDeviceHandler:
+    """Handler for one device of a FleetSimulation"""
+
+    def __init__(self, fleet: FleetSimulation, device: int):
+        self.fleet = fleet
+        self.device = device
+
+    def get_interfaces(self) -> List[Dict]:
+        self.fleet.advance()
+        return self.fleet.get_interfaces(self.device)
+
+    def get_counters(self) -> List[InterfaceCounters]:
+        self.fleet.advance()
+        return self.fleet.get_counters(self.device)
+
+    def fix_interface(self, interface_name: str) -> Dict:
+        return self.fleet.fix_interface(self.device, interface_name)
+
+
+_fleet = None
+_fleet_lock = threading.Lock()
+
+
+def get_fleet() -> FleetSimulation:
+    """Return the process-wide simulated fleet, or None when SIMULATION_DEVICES is 0"""
+    global _fleet
+
+    if _fleet is None and settings.SIMULATION_DEVICES:
+        with _fleet_lock:
+            if _fleet is None:
+                _fleet = FleetSimulation(
+                    devices=settings.SIMULATION_DEVICES,
+                    interfaces_per_device=settings.SIMULATION_INTERFACES_PER_DEVICE,
+                    seed=settings.SIMULATION_SEED,
+                    interface_mtbf=settings.SIMULATION_INTERFACE_MTBF,
+                    interface_mttr=settings.SIMULATION_INTERFACE_MTTR,
+                    device_mtbf=settings.SIMULATION_DEVICE_MTBF,
+                    device_mttr=settings.SIMULATION_DEVICE_MTTR,
+                    failure_distribution=settings.SIMULATION_FAILURE_DISTRIBUTION,
+                    repair_distribution=settings.SIMULATION_REPAIR_DISTRIBUTION,
+                    sigma=settings.SIMULATION_DURATION_SIGMA,
+                )
+                print(f"[SIMULATION] Fleet of {_fleet.devices} devices, {len(_fleet.down)} interfaces")
+    return _fleet
+
+
+def fleet_handlers(fleet: FleetSimulation) -> Dict[str, FleetDeviceHandler]:
+    """Map each simulated device name to its handler"""
+    return {fleet.device_name(device): FleetDeviceHandler(fleet, device) for device in range(fleet.devices)}
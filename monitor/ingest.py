@@ -0,0 +1,206 @@
+from typing import Dict, List, Tuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .availability import close_outages, open_outages
+from .dampening import flap_log, open_flap_logs, record_transition, settle, settled_log
+from .events import publish_changes, publish_deletions
+from .models import NetworkInterface, NetworkLog, StateVersion
+from .parsers import interface_type
+from .state_store import store_changes, update_store
+
+UPDATE_FIELDS = ['interface_type', 'ip_address', 'status', 'version', 'flapping', 'flap_penalty',
+                 'penalty_updated', 'last_changed']
+
+
+def current_state_version() -> int:
+    """Version of the most recent interface change"""
+    return StateVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+
+def current_state_versions() -> Tuple[int, int]:
+    """Version of the most recent interface change and of the most recent deletion"""
+    return StateVersion.objects.filter(pk=1).values_list('version', 'deleted_version').first() or (0, 0)
+
+
+async def acurrent_state_versions() -> Tuple[int, int]:
+    """current_state_versions() through the async ORM"""
+    return await StateVersion.objects.filter(pk=1).values_list('version', 'deleted_version').afirst() or (0, 0)
+
+
+def bump_state_version() -> int:
+    """Advance the state version; call inside the transaction that changes interfaces"""
+    # The UPDATE takes the row lock, so concurrent writers get distinct versions
+    if not StateVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        StateVersion.objects.create(pk=1, version=1)
+    return StateVersion.objects.filter(pk=1).values_list('version', flat=True).get()
+
+
+def commit_changes(version: int, interfaces: List[NetworkInterface], logs: List[NetworkLog] = ()) -> None:
+    """After a change commits: update the shared state store, then notify dashboards"""
+    store_changes(version, interfaces)
+    publish_changes(interfaces, logs)
+
+
+def interface_deleted(sender, instance: NetworkInterface, **kwargs) -> None:
+    """post_delete receiver: a deletion is a change of its own, recorded so clients behind it reload in full"""
+    version = bump_state_version()
+    StateVersion.objects.filter(pk=1).update(deleted_version=version)
+    key = (instance.device, instance.interface_name)
+    transaction.on_commit(lambda: commit_deletions(version, [key]))
+
+
+def commit_deletions(version: int, keys: List[Tuple[str, str]]) -> None:
+    """After a deletion commits: drop the interfaces from the shared state store, then from dashboards"""
+    update_store(lambda store: store.remove(version, keys))
+    publish_deletions(keys)
+
+
+def transition_log(device: str, interface_name: str, new_status: str, cause: str = 'auto-recovery') -> NetworkLog:
+    """Build (without saving) the log entry for an interface status change"""
+    if new_status == 'down':
+        return NetworkLog(
+            device=device,
+            interface_name=interface_name,
+            log_type='error',
+            message='Interface went DOWN',
+            resolved=False
+        )
+    return NetworkLog(
+        device=device,
+        interface_name=interface_name,
+        log_type='success',
+        message=f'Interface came back UP ({cause})',
+        resolved=True
+    )
+
+
+def ingest_interfaces(interfaces: List[Dict], device: str = '', cause: str = 'auto-recovery') -> Dict:
+    """Store a polled interface snapshot for one device and log any status transitions.
+
+    Current state for the device is loaded in one query and diffed in
+    memory; only new or changed rows are written, together with their
+    transition logs, in a single transaction.
+
+    Records may carry only a name and status (e.g. from syslog events);
+    a missing type or IP address keeps the stored value.
+
+    Every transition to down opens an Outage and every transition to up
+    closes it and resolves the interface's open errors, whether or not
+    dampening coalesces the log entries. ``cause`` names what brought
+    interfaces back up in their log entries.
+
+    Transitions go through flap dampening: once an interface is flagged
+    flapping, its transitions only bump the count of one open log entry
+    instead of each writing a new row.
+    """
+    now = timezone.now()
+    # Later entries win if a device reports the same interface twice
+    polled = {data['name']: data for data in interfaces}
+
+    with transaction.atomic():
+        existing = {
+            interface.interface_name: interface
+            for interface in NetworkInterface.objects.filter(device=device).order_by()
+        }
+
+        to_create = []
+        to_update = []
+        logs = []
+        transitions = []
+        went_down = []
+        came_up = []
+        coalesced = []  # flapping interfaces whose open flap entry gets one more transition
+        settled = []  # interfaces whose flap entry gets resolved
+
+        for name, data in polled.items():
+            current = existing.get(name)
+
+            if current is None:
+                to_create.append(NetworkInterface(
+                    device=device,
+                    interface_name=name,
+                    interface_type=data.get('type') or interface_type(name),
+                    ip_address=data.get('ip_address'),
+                    status=data['status'],
+                    last_changed=now,
+                ))
+                if data['status'] == 'down':
+                    went_down.append(name)
+                continue
+
+            new_type = data.get('type', current.interface_type)
+            new_ip = data['ip_address'] if 'ip_address' in data else current.ip_address
+            old_status = current.status
+            status_changed = old_status != data['status']
+            if not status_changed and settle(current, now):
+                logs.append(settled_log(device, name, old_status))
+                if old_status == 'down':
+                    # The flap is over but the outage is not: leave an open error for it
+                    logs.append(transition_log(device, name, 'down'))
+                settled.append(name)
+            elif (current.interface_type, current.ip_address, old_status) == (new_type, new_ip, data['status']):
+                continue
+
+            current.interface_type = new_type
+            current.ip_address = new_ip
+            current.status = data['status']
+            current.last_changed = now
+            to_update.append(current)
+
+            if status_changed:
+                transitions.append((name, old_status, data['status']))
+                (went_down if data['status'] == 'down' else came_up).append(name)
+                was_flapping = current.flapping
+                if record_transition(current, now):
+                    logs.append(flap_log(device, name, now))
+                elif was_flapping:
+                    coalesced.append(name)
+                else:
+                    logs.append(transition_log(device, name, data['status'], cause))
+
+        changed = to_create + to_update
+        if changed:
+            version = bump_state_version()
+            for interface in changed:
+                interface.version = version
+
+        if to_create:
+            # Upsert so a concurrent ingest of the same device cannot trip the unique constraint
+            NetworkInterface.objects.bulk_create(
+                to_create,
+                update_conflicts=True,
+                unique_fields=['device', 'interface_name'],
+                update_fields=UPDATE_FIELDS,
+            )
+        if to_update:
+            NetworkInterface.objects.bulk_update(to_update, UPDATE_FIELDS)
+        if settled:
+            open_flap_logs(device, settled).update(resolved=True)
+        if coalesced:
+            open_flap_logs(device, coalesced).update(count=F('count') + 1, last_seen=now)
+            entries = list(open_flap_logs(device, coalesced))
+            # Start a new entry if the open one was cleared in the meantime
+            missing = set(coalesced) - {entry.interface_name for entry in entries}
+            logs += entries + [flap_log(device, name, now) for name in sorted(missing)]
+        if logs:
+            NetworkLog.objects.bulk_create([log for log in logs if log.pk is None])
+        if came_up:
+            close_outages(device, came_up, now)
+            NetworkLog.objects.filter(
+                device=device, interface_name__in=came_up, log_type='error', resolved=False,
+            ).update(resolved=True)
+        if went_down:
+            open_outages(device, went_down, now)
+
+        if changed:
+            transaction.on_commit(lambda: commit_changes(version, changed, logs))
+
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'transitions': transitions,
+        'version': version if changed else None,
+    }
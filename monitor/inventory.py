@@ -0,0 +1,57 @@
+from typing import Dict, List
+
+from django.conf import settings
+
+from .models import Device
+
+DEVICE_FIELDS = ['host', 'port', 'username', 'password', 'enable_password', 'snmp_community', 'handler', 'enabled']
+
+
+def read_inventory_file(path: str) -> List[Dict]:
+    """Read device definitions from a YAML inventory file.
+
+    The file holds a top-level ``devices`` list; each entry needs a
+    ``name`` and ``host`` and may set any other Device field.
+    """
+    try:
+        import yaml
+    except ImportError:
+        raise RuntimeError('PyYAML is required to load a YAML inventory (pip install PyYAML)')
+
+    with open(path, encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+
+    devices = data.get('devices', []) if isinstance(data, dict) else data
+    for entry in devices:
+        if not entry.get('name') or not entry.get('host'):
+            raise ValueError(f'Inventory entry needs a name and host: {entry}')
+    return devices
+
+
+def sync_inventory(entries: List[Dict], prune: bool = False) -> Dict[str, int]:
+    """Create or update Device rows from inventory entries"""
+    created = updated = 0
+    names = set()
+
+    for entry in entries:
+        names.add(entry['name'])
+        defaults = {field: entry[field] for field in DEVICE_FIELDS if field in entry}
+        _, was_created = Device.objects.update_or_create(name=entry['name'], defaults=defaults)
+        if was_created:
+            created += 1
+        else:
+            updated += 1
+
+    removed = 0
+    if prune:
+        removed, _ = Device.objects.exclude(name__in=names).delete()
+
+    return {'created': created, 'updated': updated, 'removed': removed}
+
+
+def load_inventory_file(path: str = None, prune: bool = False) -> Dict[str, int]:
+    """Sync the Device table from MONITOR_INVENTORY_FILE (or the given path)"""
+    path = path or settings.MONITOR_INVENTORY_FILE
+    if not path:
+        return {'created': 0, 'updated': 0, 'removed': 0}
+    return sync_inventory(read_inventory_file(path), prune=prune)
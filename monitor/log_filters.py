@@ -0,0 +1,152 @@
+import base64
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import AsyncIterator, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import NetworkLog
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+EXPORT_COLUMNS = ['id', 'timestamp', 'device', 'interface_name', 'log_type', 'message', 'count', 'last_seen',
+                  'resolved']
+EXPORT_CHUNK_SIZE = 2000  # Rows fetched per database round trip, and per chunk sent
+
+
+def _parse_time(value: str, name: str) -> datetime:
+    moment = parse_datetime(value)
+    if moment is None:
+        raise ValueError(f'Invalid {name} time')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filter_logs(params) -> QuerySet:
+    """Apply the log API filters from query parameters.
+
+    Supported: ``device``, ``interface``, ``type``, ``resolved``
+    (true/false), ``start``/``end`` (ISO 8601) and ``since_id``.
+    Raises ValueError on malformed values.
+    """
+    logs = NetworkLog.objects.all()
+
+    if params.get('device'):
+        logs = logs.filter(device=params['device'])
+    if params.get('interface'):
+        logs = logs.filter(interface_name=params['interface'])
+    if params.get('type'):
+        if params['type'] not in dict(NetworkLog.LOG_TYPES):
+            raise ValueError(f"Invalid log type {params['type']}")
+        logs = logs.filter(log_type=params['type'])
+    if params.get('resolved'):
+        if params['resolved'].lower() not in BOOLEAN_VALUES:
+            raise ValueError('resolved must be true or false')
+        logs = logs.filter(resolved=BOOLEAN_VALUES[params['resolved'].lower()])
+    if params.get('start'):
+        logs = logs.filter(timestamp__gte=_parse_time(params['start'], 'start'))
+    if params.get('end'):
+        logs = logs.filter(timestamp__lt=_parse_time(params['end'], 'end'))
+    if params.get('since_id'):
+        if not params['since_id'].isdigit():
+            raise ValueError('since_id must be a log id')
+        logs = logs.filter(id__gt=int(params['since_id']))
+
+    return logs
+
+
+def parse_limit(value: Optional[str]) -> int:
+    if value in (None, ''):
+        return DEFAULT_LIMIT
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(int(value), MAX_LIMIT)
+
+
+def encode_cursor(log: NetworkLog) -> str:
+    """Opaque cursor pointing just past log in (-timestamp, -id) order"""
+    raw = f'{log.timestamp.isoformat()}|{log.id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        timestamp, pk = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rsplit('|', 1)
+        return _parse_time(timestamp, 'cursor'), int(pk)
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+
+def page_query(logs: QuerySet, limit: int, cursor: str = None) -> QuerySet:
+    """The rows of one page plus one, to tell whether another page follows"""
+    if cursor:
+        timestamp, pk = decode_cursor(cursor)
+        logs = logs.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+    return logs.order_by('-timestamp', '-id')[:limit + 1]
+
+
+def split_page(page: List[NetworkLog], limit: int) -> Tuple[List[NetworkLog], Optional[str]]:
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def paginate_logs(logs: QuerySet, limit: int, cursor: str = None) -> Tuple[List[NetworkLog], Optional[str]]:
+    """One page of logs newest first, plus the cursor for the next page.
+
+    Keyset pagination on (timestamp, id): every page is an index range
+    scan, however deep into the history it is.
+    """
+    return split_page(list(page_query(logs, limit, cursor)), limit)
+
+
+async def apaginate_logs(logs: QuerySet, limit: int, cursor: str = None) -> Tuple[List[NetworkLog], Optional[str]]:
+    """paginate_logs() through the async ORM"""
+    return split_page([log async for log in page_query(logs, limit, cursor)], limit)
+
+
+class Echo:
+    """File-like object whose write() hands the line back, so csv.writer formats without buffering"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def aexport_logs(logs: QuerySet, export_format: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[str]:
+    """Matching logs oldest first as NDJSON or CSV text, one chunk of rows at a time.
+
+    Rows come from a database cursor ``chunk_size`` at a time as plain
+    tuples, so memory stays flat however many rows match.
+    """
+    # Django 4.2's values_list().aiterator() opens its cursor on the event
+    # loop; drive the sync iterator from the ORM's thread instead
+    rows = logs.order_by('timestamp', 'id').values_list(*EXPORT_COLUMNS).iterator(chunk_size=chunk_size)
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+
+    writer = csv.writer(Echo())
+    if export_format == 'csv':
+        yield writer.writerow(EXPORT_COLUMNS)
+
+    while True:
+        chunk = await next_chunk()
+        if not chunk:
+            break
+        if export_format == 'csv':
+            yield ''.join(writer.writerow([export_value(value) for value in row]) for row in chunk)
+        else:
+            yield ''.join(json.dumps(dict(zip(EXPORT_COLUMNS, map(export_value, row)))) + '\n' for row in chunk)
+        if len(chunk) < chunk_size:
+            break
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from monitor.archive import FORMATS, TABLES, archive_table
+from monitor.stats import invalidate_counters
+
+AGE_UNITS = {'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
+
+def parse_age(value: str) -> timedelta:
+    unit = value[-1:]
+    if unit not in AGE_UNITS or not value[:-1].isdigit():
+        raise CommandError(f'Invalid age {value!r}, use e.g. 12h, 30d or 4w')
+    return timedelta(**{AGE_UNITS[unit]: int(value[:-1])})
+
+
+class Command(BaseCommand):
+    help = 'Move old logs, stats samples and interface rates into compressed archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            default='30d',
+            help='Archive rows older than this age, e.g. 12h, 30d or 4w (default 30d)',
+        )
+        parser.add_argument(
+            '--tables',
+            default=','.join(TABLES),
+            help=f'Comma-separated tables to archive (default {",".join(TABLES)})',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=None,
+            help='File format (defaults to ARCHIVE_FORMAT)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows read, written and deleted per batch',
+        )
+        parser.add_argument(
+            '--dir',
+            default=None,
+            help='Archive directory (defaults to ARCHIVE_DIR)',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - parse_age(options['older_than'])
+        tables = [table.strip() for table in options['tables'].split(',') if table.strip()]
+        unknown = [table for table in tables if table not in TABLES]
+        if unknown:
+            raise CommandError(f'Unknown tables {", ".join(unknown)}, use {", ".join(TABLES)}')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        directory = options['dir'] or settings.ARCHIVE_DIR
+        for table in tables:
+            try:
+                result = archive_table(table, cutoff, directory, options['format'], options['batch_size'])
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f'{table}: archived {result["rows"]} rows into {result["files"]} files')
+
+        # Archived error logs no longer count toward the dashboard's totals
+        invalidate_counters()
+        self.stdout.write(self.style.SUCCESS(f'Archived rows older than {cutoff.isoformat()} to {directory}'))
@@ -0,0 +1,318 @@
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, List
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from monitor.cisco_handler import SimulationHandler
+from monitor.collector import Collector
+from monitor.models import NetworkInterface, NetworkLog
+
+ENDPOINTS = {
+    'interfaces': 'get_interfaces',
+    'stats': 'get_stats',
+    'logs': 'get_logs',
+}
+
+LOG_MESSAGES = [
+    ('error', 'Interface went DOWN', False),
+    ('success', 'Interface came back UP', True),
+    ('warning', 'Interface is flapping', False),
+    ('info', 'Interface discovered', True),
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def database_size() -> int:
+    """Bytes used by the default database, or None where the backend cannot tell"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            if connection.settings_dict['NAME'] != ':memory:':
+                cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            cursor.execute('PRAGMA page_count')
+            pages = cursor.fetchone()[0]
+            cursor.execute('PRAGMA page_size')
+            return pages * cursor.fetchone()[0]
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_database_size(current_database())')
+            return cursor.fetchone()[0]
+    return None
+
+
+def seed(interfaces: int, logs: int, devices: int = 10, batch_size: int = 5000):
+    """Fill the snapshot with `interfaces` interfaces spread over `devices` and `logs` log rows"""
+    now = timezone.now()
+    devices = max(1, min(devices, interfaces or 1))
+
+    NetworkInterface.objects.bulk_create(
+        [
+            NetworkInterface(
+                device=f'bench-{i % devices}',
+                interface_name=f'GigabitEthernet0/{i // devices}',
+                interface_type='ethernet',
+                ip_address=f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}',
+                status='down' if i % 20 == 0 else 'up',
+            )
+            for i in range(interfaces)
+        ],
+        batch_size=batch_size,
+    )
+
+    for start in range(0, logs, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, logs)):
+            log_type, message, resolved = LOG_MESSAGES[i % len(LOG_MESSAGES)]
+            batch.append(NetworkLog(
+                device=f'bench-{i % devices}',
+                interface_name=f'GigabitEthernet0/{i % max(1, interfaces // devices)}',
+                log_type=log_type,
+                message=message,
+                resolved=resolved,
+                timestamp=now - timedelta(seconds=logs - i),
+            ))
+        NetworkLog.objects.bulk_create(batch)
+
+
+def logged_in_client() -> Client:
+    client = Client()
+    client.post(reverse('login'), {'username': os.getenv('LOGIN_USERNAME', 'admin'),
+                                   'password': os.getenv('LOGIN_PASSWORD', 'admin123')})
+    return client
+
+
+def run_client(client: Client, endpoints: List[str], requests: int, samples: Dict[str, List],
+               errors: Dict[str, int], lock: threading.Lock):
+    """One simulated dashboard: cycle through the endpoints as its refresh loop does"""
+    version = None
+    timings = {name: [] for name in endpoints}
+    failed = {name: 0 for name in endpoints}
+
+    try:
+        for i in range(requests):
+            name = endpoints[i % len(endpoints)]
+            params = {}
+            if name == 'interfaces' and version is not None:
+                params['since'] = version
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(reverse(ENDPOINTS[name]), params)
+                elapsed = time.perf_counter() - started
+
+            if response.status_code not in (200, 304):
+                failed[name] += 1
+                continue
+            if name == 'interfaces':
+                version = response.json()['version']
+            timings[name].append((elapsed, len(queries)))
+    finally:
+        connection.close()
+
+    with lock:
+        for name in endpoints:
+            samples[name].extend(timings[name])
+            errors[name] += failed[name]
+
+
+def run_clients(endpoints: List[str], clients: int, requests: int, sweep_interval: float = 0) -> Dict:
+    """Drive the endpoints from `clients` concurrent dashboards while a simulated collector writes"""
+    samples = {name: [] for name in endpoints}
+    errors = {name: 0 for name in endpoints}
+    lock = threading.Lock()
+
+    # Log in up front so session writes are not part of the measured run
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(logged_in_client(), endpoints, requests, samples, errors, lock),
+            name=f'bench-client-{i}',
+        )
+        for i in range(clients)
+    ]
+
+    sweeper = None
+    stop = threading.Event()
+    if sweep_interval > 0:
+        # The simulated device stands in for the collector's writes
+        collector = Collector(handler=SimulationHandler(), interval=sweep_interval)
+
+        def sweep_loop():
+            while not stop.is_set():
+                try:
+                    collector.sweep()
+                    collector.record_stats()
+                except Exception as e:
+                    print(f"[BENCH] Sweep failed: {e}")
+                stop.wait(sweep_interval)
+            connection.close()
+
+        sweeper = threading.Thread(target=sweep_loop, name='bench-collector', daemon=True)
+        sweeper.start()
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if sweeper is not None:
+        stop.set()
+        sweeper.join()
+
+    results = {}
+    for name in endpoints:
+        latencies = [latency for latency, _ in samples[name]]
+        query_counts = [count for _, count in samples[name]]
+        results[name] = {
+            'requests': len(latencies),
+            'errors': errors[name],
+            'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                'p50': round(percentile(latencies, 50) * 1000, 3),
+                'p99': round(percentile(latencies, 99) * 1000, 3),
+                'max': round(max(latencies, default=0) * 1000, 3),
+            },
+            'queries': {
+                'mean': round(sum(query_counts) / len(query_counts), 2) if query_counts else 0.0,
+                'max': max(query_counts, default=0),
+            },
+        }
+
+    total = sum(result['requests'] for result in results.values())
+    return {
+        'seconds': round(elapsed, 3),
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 1) if elapsed else None,
+        'endpoints': results,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Seed a throwaway database and load-test the dashboard API with concurrent simulated clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interfaces', type=int, default=1000, help='Interfaces to seed (default 1000)')
+        parser.add_argument('--devices', type=int, default=10, help='Devices the interfaces are spread over')
+        parser.add_argument('--logs', type=int, default=100000, help='Log rows to seed (default 100000)')
+        parser.add_argument('--clients', type=int, default=8, help='Concurrent dashboard clients (default 8)')
+        parser.add_argument('--requests', type=int, default=60, help='Requests per client (default 60)')
+        parser.add_argument(
+            '--endpoints',
+            default=','.join(ENDPOINTS),
+            help=f"Comma-separated endpoints to drive (default {','.join(ENDPOINTS)})",
+        )
+        parser.add_argument(
+            '--sweep-interval',
+            type=float,
+            default=1.0,
+            help='Seconds between simulated collector sweeps during the run; 0 disables writes',
+        )
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown or not endpoints:
+            self.stderr.write(f"Unknown endpoints: {', '.join(sorted(unknown)) or 'none given'}")
+            return
+
+        # Never touch the configured database: work in a test database, on
+        # disk for SQLite so that threads share it and its size is real
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        workdir = None
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            workdir = tempfile.TemporaryDirectory()
+            test_settings['NAME'] = os.path.join(workdir.name, 'bench.sqlite3')
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(COLLECTOR_EMBEDDED=False):
+                report = self.benchmark(endpoints, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if workdir is not None:
+                test_settings['NAME'] = None
+                workdir.cleanup()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        run = report['run']
+        self.stdout.write(
+            f"{run['requests']} requests from {options['clients']} clients in {run['seconds']} s "
+            f"({run['throughput_rps']} req/s)"
+        )
+        for name, result in run['endpoints'].items():
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"  {name:<11} {result['requests']:>6} req  p50 {latency['p50']:8.2f} ms  "
+                f"p99 {latency['p99']:8.2f} ms  {result['queries']['mean']:5.1f} queries/req  "
+                f"{result['errors']} errors"
+            )
+        size = report['database_bytes']
+        if size['empty'] is not None:
+            self.stdout.write(
+                f"  database    {size['empty']:,} B empty, {size['seeded']:,} B seeded, "
+                f"{size['after_run']:,} B after the run"
+            )
+
+    def benchmark(self, endpoints: List[str], options) -> Dict:
+        empty_size = database_size()
+        started = time.perf_counter()
+        seed(options['interfaces'], options['logs'], devices=options['devices'])
+        seed_seconds = time.perf_counter() - started
+        seeded_size = database_size()
+
+        run = run_clients(endpoints, options['clients'], options['requests'], options['sweep_interval'])
+        close_old_connections()
+
+        return {
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+            },
+            'config': {
+                'interfaces': options['interfaces'],
+                'devices': options['devices'],
+                'logs': options['logs'],
+                'clients': options['clients'],
+                'requests_per_client': options['requests'],
+                'endpoints': endpoints,
+                'sweep_interval': options['sweep_interval'],
+                'stats_cache_ttl': settings.STATS_CACHE_TTL,
+            },
+            'seed_seconds': round(seed_seconds, 3),
+            'database_bytes': {
+                'empty': empty_size,
+                'seeded': seeded_size,
+                'after_run': database_size(),
+            },
+            'run': run,
+        }
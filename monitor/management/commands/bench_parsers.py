@@ -0,0 +1,70 @@
+import json
+import re
+import time
+from pathlib import Path
+from typing import Tuple
+
+from django.core.management.base import BaseCommand
+
+from monitor.parsers import parse_interfaces_status, parse_ip_interface_brief, parse_show_interfaces
+
+FIXTURE_DIR = Path(__file__).resolve().parents[2] / 'testdata' / 'ios'
+
+# fixture file, parser, pattern matching the start of one interface's output
+BENCHMARKS = {
+    'show ip interface brief': ('show_ip_interface_brief.txt', parse_ip_interface_brief, r'^\S+\s+\S+\s+(?:YES|NO) '),
+    'show interfaces': ('show_interfaces.txt', parse_show_interfaces, r'^\S+ is '),
+    'show interfaces status': ('show_interfaces_status.txt', parse_interfaces_status, r'^(?!Port )\S'),
+}
+
+
+def build_output(fixture: str, start_re: str, count: int) -> Tuple[str, int]:
+    """Repeat the fixture's interfaces until the output holds at least `count` of them"""
+    text = (FIXTURE_DIR / fixture).read_text()
+    starts = [match.start() for match in re.finditer(start_re, text, re.MULTILINE)]
+    header, body = text[:starts[0]], text[starts[0]:]
+    copies = -(-count // len(starts))
+    return header + body * copies, copies * len(starts)
+
+
+class Command(BaseCommand):
+    help = 'Measure IOS show-command parse throughput on fixture outputs scaled to a large chassis'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interfaces', type=int, default=10000, help='Interfaces per output (default 10000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per parser; the best one is reported')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        results = []
+
+        for command, (fixture, parse, start_re) in BENCHMARKS.items():
+            output, interfaces = build_output(fixture, start_re, options['interfaces'])
+
+            best = None
+            for _ in range(max(1, options['repeat'])):
+                started = time.perf_counter()
+                records = parse(output)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+
+            results.append({
+                'command': command,
+                'interfaces': interfaces,
+                'records': len(records),
+                'bytes': len(output),
+                'seconds': round(best, 6),
+                'interfaces_per_sec': round(len(records) / best) if best else None,
+                'mb_per_sec': round(len(output) / best / 1e6, 2) if best else None,
+            })
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result['command']:<26} {result['records']:>7} records  "
+                f"{result['seconds'] * 1000:8.1f} ms  "
+                f"{result['interfaces_per_sec']:>10} if/s  {result['mb_per_sec']:>7} MB/s"
+            )
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.inventory import load_inventory_file
+
+
+class Command(BaseCommand):
+    help = 'Load the device inventory from a YAML file into the Device table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default=None,
+            help='Inventory file (defaults to INVENTORY_FILE)',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete devices that are not in the file',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.MONITOR_INVENTORY_FILE
+        if not path:
+            raise CommandError('No inventory file given and INVENTORY_FILE is not set')
+
+        try:
+            counts = load_inventory_file(path, prune=options['prune'])
+        except (OSError, RuntimeError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Inventory loaded: {counts['created']} created, {counts['updated']} updated, "
+            f"{counts['removed']} removed"
+        ))
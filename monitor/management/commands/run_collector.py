@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from monitor.collector import Collector
+from monitor.events import local_channel_layer
+
+
+class Command(BaseCommand):
+    help = 'Poll network devices on a schedule and store the interface snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Seconds between sweeps (defaults to COLLECTOR_INTERVAL)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run a single sweep (plus the stats sample and rollups) and exit',
+        )
+
+    def handle(self, *args, **options):
+        collector = Collector(interval=options['interval'])
+
+        if options['once']:
+            collector.load_inventory()
+            results = collector.sweep()
+            collector.record_stats()
+
+            polled = [result for result in results.values() if result.ok]
+            failed = [name or 'device' for name, result in results.items() if not result.ok]
+            interfaces = sum(len(result.interfaces) for result in polled)
+            self.stdout.write(self.style.SUCCESS(f'Collected {interfaces} interfaces from {len(polled)} devices'))
+            if failed:
+                self.stderr.write(self.style.ERROR(f'{len(failed)} devices failed: {", ".join(sorted(failed))}'))
+            return
+
+        if local_channel_layer():
+            self.stderr.write(self.style.WARNING(
+                'The channel layer is in-memory, so dashboards get no live updates from this process. Set REDIS_URL.'
+            ))
+        self.stdout.write(f'Collector started (every {collector.interval}s). Press Ctrl+C to stop.')
+        try:
+            collector.run_forever()
+        except KeyboardInterrupt:
+            collector.stop()
+            self.stdout.write('Collector stopped')
@@ -0,0 +1,39 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from monitor.events import local_channel_layer
+from monitor.syslog_listener import SyslogBatcher, serve_syslog
+
+
+class Command(BaseCommand):
+    help = 'Listen for syslog link up/down messages and apply them to the interface snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default=None, help='Address to bind (defaults to SYSLOG_HOST)')
+        parser.add_argument('--port', type=int, default=None, help='UDP port (defaults to SYSLOG_PORT)')
+        parser.add_argument(
+            '--flush-interval',
+            type=float,
+            default=None,
+            help='Seconds between batched writes (defaults to SYSLOG_FLUSH_INTERVAL)',
+        )
+
+    def handle(self, *args, **options):
+        async def run():
+            batcher = SyslogBatcher(flush_interval=options['flush_interval'])
+            await serve_syslog(options['host'], options['port'], batcher=batcher)
+
+        if local_channel_layer():
+            self.stderr.write(self.style.WARNING(
+                'The channel layer is in-memory, so dashboards get no live updates from this process. Set REDIS_URL.'
+            ))
+        self.stdout.write(
+            f"Syslog listener starting on {options['host'] or settings.SYSLOG_HOST}:"
+            f"{options['port'] or settings.SYSLOG_PORT}/udp. Press Ctrl+C to stop."
+        )
+        try:
+            asyncio.run(run())
+        except KeyboardInterrupt:
+            self.stdout.write('Syslog listener stopped')
@@ -0,0 +1,177 @@
+import bisect
+import math
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Device round trips: SSH commands and whole collector sweeps
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """A named metric family with one series per combination of label values.
+
+    A minimal stand-in for prometheus_client: series live in this process
+    only, so with several workers each one exposes its own counts.
+    """
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f'{self.name} takes labels {self.label_names}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            series = sorted(self._series.items())
+        for values, state in series:
+            lines.extend(self.render_series(values, state))
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._series.get(self._key(labels), 0)
+
+    def render_series(self, values, state):
+        return [f'{self.name}{format_labels(self.label_names, values)} {format_value(state)}']
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry=None):
+        super().__init__(name, documentation, labels, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._series.get(key)
+            if state is None:
+                # per-bucket (not cumulative) counts, plus the +Inf overflow, sum and count
+                state = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        state = self._series.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render_series(self, values, state):
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            labels = format_labels(self.label_names, values, ('le', format_value(bound)))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = format_labels(self.label_names, values)
+        lines.append(f'{self.name}_sum{labels} {format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric):
+        if metric.name in self.metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_DURATION = Histogram(
+    'netmon_http_request_duration_seconds', 'Time spent handling a request, by view',
+    labels=('view', 'method', 'status'),
+)
+REQUEST_QUERIES = Histogram(
+    'netmon_http_request_db_queries', 'Database queries run per request, by view',
+    labels=('view',), buckets=QUERY_COUNT_BUCKETS,
+)
+DB_QUERIES = Counter('netmon_db_queries_total', 'Database queries run while handling requests', labels=('view',))
+DB_QUERY_SECONDS = Counter(
+    'netmon_db_query_seconds_total', 'Time spent in database queries while handling requests', labels=('view',),
+)
+CACHE_REQUESTS = Counter('netmon_cache_requests_total', 'Cache lookups by outcome', labels=('cache', 'result'))
+SSH_COMMAND_DURATION = Histogram(
+    'netmon_ssh_command_duration_seconds', 'Duration of commands run over SSH, by device',
+    labels=('device',), buckets=SLOW_BUCKETS,
+)
+SSH_COMMAND_FAILURES = Counter('netmon_ssh_command_failures_total', 'Commands that failed over SSH', labels=('device',))
+SWEEP_DURATION = Histogram(
+    'netmon_collector_sweep_duration_seconds', 'Duration of a collector sweep over all devices', buckets=SLOW_BUCKETS,
+)
+SWEEP_LAST_SUCCESS = Gauge(
+    'netmon_collector_last_sweep_timestamp_seconds', 'Unix time the last sweep that polled at least one device finished',
+)
+POLL_FAILURES = Counter('netmon_collector_poll_failures_total', 'Device polls that failed, by device', labels=('device',))
+
+
+def record_cache(cache_name: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache_name, result='hit' if hit else 'miss')
@@ -0,0 +1,74 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connection
+
+from .metrics import DB_QUERIES, DB_QUERY_SECONDS, REQUEST_DURATION, REQUEST_QUERIES
+
+
+class QueryRecorder:
+    """Database execute wrapper that counts queries and the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Records latency and database usage of every request, labelled by view name"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        queries = QueryRecorder()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        self.record(request, response, queries, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        queries = QueryRecorder()
+
+        # Async views reach the database through sync_to_async, which runs
+        # every call of one request on the same thread; wrap that thread's connection
+        def install():
+            connection.execute_wrappers.append(queries)
+
+        def remove():
+            connection.execute_wrappers.remove(queries)
+
+        started = time.perf_counter()
+        await sync_to_async(install)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(remove)()
+        self.record(request, response, queries, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, queries: QueryRecorder, elapsed: float):
+        match = request.resolver_match
+        # The URL name keeps label cardinality bounded; unmatched paths share one label
+        view = (match.view_name if match else '') or 'unmatched'
+        REQUEST_DURATION.observe(elapsed, view=view, method=request.method, status=response.status_code)
+        REQUEST_QUERIES.observe(queries.count, view=view)
+        DB_QUERIES.inc(queries.count, view=view)
+        DB_QUERY_SECONDS.inc(queries.seconds, view=view)
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Device',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('host', models.CharField(max_length=255)),
+                ('port', models.PositiveIntegerField(default=22)),
+                ('username', models.CharField(blank=True, max_length=100)),
+                ('password', models.CharField(blank=True, max_length=255)),
+                ('enable_password', models.CharField(blank=True, max_length=255)),
+                ('handler', models.CharField(choices=[('ssh', 'SSH'), ('simulation', 'Simulation')], default='ssh', max_length=20)),
+                ('enabled', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AlterModelOptions(
+            name='networkinterface',
+            options={'ordering': ['device', 'interface_name']},
+        ),
+        migrations.AddField(
+            model_name='networkinterface',
+            name='device',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='networklog',
+            name='device',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+def remove_duplicate_interfaces(apps, schema_editor):
+    """Keep the oldest row per (device, interface_name) so the constraint can be added"""
+    NetworkInterface = apps.get_model('monitor', 'NetworkInterface')
+    seen = set()
+    duplicates = []
+
+    for pk, device, name in NetworkInterface.objects.order_by('id').values_list('id', 'device', 'interface_name'):
+        if (device, name) in seen:
+            duplicates.append(pk)
+        else:
+            seen.add((device, name))
+
+    NetworkInterface.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0002_device_inventory'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_interfaces, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='networkinterface',
+            constraint=models.UniqueConstraint(fields=('device', 'interface_name'), name='unique_interface_per_device'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0003_unique_interface_per_device'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetworkStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('1m', '1 minute'), ('1h', '1 hour'), ('1d', '1 day')], max_length=2)),
+                ('bucket_start', models.DateTimeField()),
+                ('samples', models.IntegerField(default=0)),
+                ('uptime_min', models.FloatField(default=100.0)),
+                ('uptime_max', models.FloatField(default=100.0)),
+                ('uptime_avg', models.FloatField(default=100.0)),
+                ('interfaces_up_min', models.IntegerField(default=0)),
+                ('interfaces_up_max', models.IntegerField(default=0)),
+                ('interfaces_up_avg', models.FloatField(default=0)),
+                ('interfaces_down_min', models.IntegerField(default=0)),
+                ('interfaces_down_max', models.IntegerField(default=0)),
+                ('interfaces_down_avg', models.FloatField(default=0)),
+                ('total_errors_max', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Network Stats Rollups',
+                'ordering': ['resolution', '-bucket_start'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='networkstats',
+            name='timestamp',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddConstraint(
+            model_name='networkstatsrollup',
+            constraint=models.UniqueConstraint(fields=('resolution', 'bucket_start'), name='unique_rollup_bucket'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0004_stats_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='networklog',
+            options={'ordering': ['-timestamp', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='networklog',
+            index=models.Index(fields=['-timestamp', '-id'], name='log_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networklog',
+            index=models.Index(fields=['interface_name', '-timestamp', '-id'], name='log_interface_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networklog',
+            index=models.Index(fields=['device', 'interface_name', '-timestamp'], name='log_device_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networklog',
+            index=models.Index(fields=['log_type', 'resolved', '-timestamp'], name='log_type_resolved_idx'),
+        ),
+    ]
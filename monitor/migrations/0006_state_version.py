@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:04
+
+from django.db import migrations, models
+
+
+def create_state_version(apps, schema_editor):
+    StateVersion = apps.get_model('monitor', 'StateVersion')
+    StateVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0005_log_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StateVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='networkinterface',
+            name='version',
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(create_state_version, migrations.RunPython.noop),
+    ]
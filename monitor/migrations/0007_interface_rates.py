@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0006_state_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterfaceRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device', models.CharField(blank=True, default='', max_length=100)),
+                ('interface_name', models.CharField(max_length=100)),
+                ('timestamp', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('in_bps', models.FloatField(default=0)),
+                ('out_bps', models.FloatField(default=0)),
+                ('in_pps', models.FloatField(default=0)),
+                ('out_pps', models.FloatField(default=0)),
+                ('errors_per_sec', models.FloatField(default=0)),
+                ('drops_per_sec', models.FloatField(default=0)),
+                ('in_utilization', models.FloatField(default=0)),
+                ('out_utilization', models.FloatField(default=0)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['device', 'interface_name', 'timestamp'], name='rate_interface_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0007_interface_rates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='snmp_community',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='device',
+            name='handler',
+            field=models.CharField(choices=[('ssh', 'SSH'), ('snmp', 'SNMP'), ('simulation', 'Simulation')], default='ssh', max_length=20),
+        ),
+    ]
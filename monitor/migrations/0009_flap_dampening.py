@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0008_snmp_devices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkinterface',
+            name='flap_penalty',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='networkinterface',
+            name='flapping',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='networkinterface',
+            name='penalty_updated',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='networklog',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='networklog',
+            name='last_seen',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+# Append-only time-series tables: on PostgreSQL a BRIN index on the timestamp
+# serves range scans and pruning at a fraction of a B-tree's size and write cost.
+BRIN_INDEXES = [
+    ('monitor_interfacerate_time_brin', 'monitor_interfacerate'),
+    ('monitor_networkstats_time_brin', 'monitor_networkstats'),
+]
+
+
+def create_brin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table in BRIN_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING brin ("timestamp")')
+
+
+def drop_brin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in BRIN_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0009_flap_dampening'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='networklog',
+            index=models.Index(condition=models.Q(('resolved', False)), fields=['device', 'interface_name'], name='log_unresolved_idx'),
+        ),
+        migrations.RunPython(create_brin_indexes, drop_brin_indexes),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:35
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0011_remediation_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device', models.CharField(blank=True, default='', max_length=100)),
+                ('interface_name', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('down_seconds', models.FloatField(default=0)),
+                ('outages', models.IntegerField(default=0)),
+                ('repairs', models.IntegerField(default=0)),
+                ('repair_seconds', models.FloatField(default=0)),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Outage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device', models.CharField(blank=True, default='', max_length=100)),
+                ('interface_name', models.CharField(max_length=100)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['started_at'], name='outage_started_idx'), models.Index(fields=['ended_at'], name='outage_ended_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='outage',
+            constraint=models.UniqueConstraint(condition=models.Q(('ended_at__isnull', True)), fields=('device', 'interface_name'), name='unique_open_outage'),
+        ),
+        migrations.AddIndex(
+            model_name='availabilitydaily',
+            index=models.Index(fields=['day'], name='availability_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='availabilitydaily',
+            constraint=models.UniqueConstraint(fields=('device', 'interface_name', 'day'), name='unique_availability_day'),
+        ),
+    ]
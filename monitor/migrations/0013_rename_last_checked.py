@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0012_availability'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='networkinterface',
+            old_name='last_checked',
+            new_name='last_changed',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0013_rename_last_checked'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stateversion',
+            name='deleted_version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
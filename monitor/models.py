@@ -1,23 +1,68 @@
+from datetime import timedelta
+
 from django.db import models
 from django.utils import timezone
 
 
+class Device(models.Model):
+    """Model to store a polled network device from the inventory"""
+    HANDLER_TYPES = [
+        ('ssh', 'SSH'),
+        ('snmp', 'SNMP'),
+        ('simulation', 'Simulation'),
+    ]
+
+    name = models.CharField(max_length=100, unique=True)
+    host = models.CharField(max_length=255)
+    port = models.PositiveIntegerField(default=22)
+    username = models.CharField(max_length=100, blank=True)
+    password = models.CharField(max_length=255, blank=True)
+    enable_password = models.CharField(max_length=255, blank=True)
+    snmp_community = models.CharField(max_length=255, blank=True)
+    handler = models.CharField(max_length=20, choices=HANDLER_TYPES, default='ssh')
+    enabled = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} ({self.host})"
+
+
 class NetworkInterface(models.Model):
     """Model to store network interface information"""
+    device = models.CharField(max_length=100, blank=True, default='')
     interface_name = models.CharField(max_length=100)
     interface_type = models.CharField(max_length=50)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     status = models.CharField(max_length=20, default='up')
-    last_checked = models.DateTimeField(auto_now=True)
+    version = models.BigIntegerField(default=0, db_index=True)  # StateVersion at the last change
+    flapping = models.BooleanField(default=False)
+    flap_penalty = models.FloatField(default=0)  # Dampening penalty as of penalty_updated
+    penalty_updated = models.DateTimeField(null=True, blank=True)
+    last_changed = models.DateTimeField(auto_now=True)  # Last time any stored field changed, not the last poll
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['interface_name']
+        ordering = ['device', 'interface_name']
+        constraints = [
+            models.UniqueConstraint(fields=['device', 'interface_name'], name='unique_interface_per_device'),
+        ]
 
     def __str__(self):
         return f"{self.interface_name} - {self.status}"
 
 
+class StateVersion(models.Model):
+    """Model holding the interface state version (a single row bumped on every change)"""
+    version = models.BigIntegerField(default=0)
+    deleted_version = models.BigIntegerField(default=0)  # Version of the latest interface deletion
+
+    def __str__(self):
+        return f"State version {self.version}"
+
+
 class NetworkLog(models.Model):
     """Model to store network event logs"""
     LOG_TYPES = [
@@ -27,14 +72,27 @@ class NetworkLog(models.Model):
         ('success', 'Success'),
     ]
 
+    device = models.CharField(max_length=100, blank=True, default='')
     interface_name = models.CharField(max_length=100)
     log_type = models.CharField(max_length=20, choices=LOG_TYPES, default='info')
     message = models.TextField()
-    timestamp = models.DateTimeField(default=timezone.now)
+    timestamp = models.DateTimeField(default=timezone.now)  # First occurrence
     resolved = models.BooleanField(default=False)
+    count = models.PositiveIntegerField(default=1)  # Occurrences coalesced into this entry
+    last_seen = models.DateTimeField(null=True, blank=True)
 
     class Meta:
-        ordering = ['-timestamp']
+        # id breaks timestamp ties so keyset pagination is stable
+        ordering = ['-timestamp', '-id']
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='log_time_idx'),
+            models.Index(fields=['interface_name', '-timestamp', '-id'], name='log_interface_time_idx'),
+            models.Index(fields=['device', 'interface_name', '-timestamp'], name='log_device_time_idx'),
+            models.Index(fields=['log_type', 'resolved', '-timestamp'], name='log_type_resolved_idx'),
+            # Open entries only (flap coalescing looks these up on every flapping transition)
+            models.Index(fields=['device', 'interface_name'], condition=models.Q(resolved=False),
+                         name='log_unresolved_idx'),
+        ]
 
     def __str__(self):
         return f"{self.timestamp} - {self.interface_name}: {self.log_type}"
@@ -47,7 +105,7 @@ class NetworkStats(models.Model):
     interfaces_down = models.IntegerField(default=0)
     total_errors = models.IntegerField(default=0)
     uptime_percentage = models.FloatField(default=100.0)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         ordering = ['-timestamp']
@@ -55,3 +113,152 @@ class NetworkStats(models.Model):
 
     def __str__(self):
         return f"Stats at {self.timestamp}"
+
+
+class NetworkStatsRollup(models.Model):
+    """Model to store NetworkStats samples aggregated into fixed time buckets"""
+    RESOLUTIONS = [
+        ('1m', '1 minute'),
+        ('1h', '1 hour'),
+        ('1d', '1 day'),
+    ]
+
+    resolution = models.CharField(max_length=2, choices=RESOLUTIONS)
+    bucket_start = models.DateTimeField()
+    samples = models.IntegerField(default=0)
+    uptime_min = models.FloatField(default=100.0)
+    uptime_max = models.FloatField(default=100.0)
+    uptime_avg = models.FloatField(default=100.0)
+    interfaces_up_min = models.IntegerField(default=0)
+    interfaces_up_max = models.IntegerField(default=0)
+    interfaces_up_avg = models.FloatField(default=0)
+    interfaces_down_min = models.IntegerField(default=0)
+    interfaces_down_max = models.IntegerField(default=0)
+    interfaces_down_avg = models.FloatField(default=0)
+    total_errors_max = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['resolution', '-bucket_start']
+        verbose_name_plural = 'Network Stats Rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['resolution', 'bucket_start'], name='unique_rollup_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.resolution} stats at {self.bucket_start}"
+
+
+class InterfaceRate(models.Model):
+    """Model to store per-interface traffic and error rates computed from counter deltas"""
+    device = models.CharField(max_length=100, blank=True, default='')
+    interface_name = models.CharField(max_length=100)
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
+    in_bps = models.FloatField(default=0)
+    out_bps = models.FloatField(default=0)
+    in_pps = models.FloatField(default=0)
+    out_pps = models.FloatField(default=0)
+    errors_per_sec = models.FloatField(default=0)
+    drops_per_sec = models.FloatField(default=0)
+    in_utilization = models.FloatField(default=0)  # Percent of bandwidth
+    out_utilization = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['device', 'interface_name', 'timestamp'], name='rate_interface_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.interface_name} rates at {self.timestamp}"
+
+
+class RemediationJob(models.Model):
+    """Model to store a queued fix of one interface and its outcome"""
+    STATUSES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['queued', 'running']
+
+    device = models.CharField(max_length=100, blank=True, default='')
+    interface_name = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUSES, default='queued')
+    message = models.TextField(blank=True)
+    requires_manual_intervention = models.BooleanField(default=False)
+    requested_by = models.CharField(max_length=150, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # At most one queued or running fix per interface
+            models.UniqueConstraint(
+                fields=['device', 'interface_name'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='unique_active_remediation',
+            ),
+        ]
+
+    @property
+    def active(self) -> bool:
+        return self.status in self.ACTIVE_STATUSES
+
+    def __str__(self):
+        return f"Fix {self.interface_name} - {self.status}"
+
+
+class Outage(models.Model):
+    """Model to store one interval an interface spent down; ended_at is empty while it still is"""
+    device = models.CharField(max_length=100, blank=True, default='')
+    interface_name = models.CharField(max_length=100)
+    started_at = models.DateTimeField(default=timezone.now)
+    ended_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['started_at'], name='outage_started_idx'),
+            models.Index(fields=['ended_at'], name='outage_ended_idx'),
+        ]
+        constraints = [
+            # An interface is in at most one outage at a time
+            models.UniqueConstraint(
+                fields=['device', 'interface_name'],
+                condition=models.Q(ended_at__isnull=True),
+                name='unique_open_outage',
+            ),
+        ]
+
+    @property
+    def duration(self) -> timedelta:
+        return (self.ended_at or timezone.now()) - self.started_at
+
+    def __str__(self):
+        return f"{self.interface_name} down from {self.started_at}"
+
+
+class AvailabilityDaily(models.Model):
+    """Model to store one interface's outage totals for one UTC day"""
+    device = models.CharField(max_length=100, blank=True, default='')
+    interface_name = models.CharField(max_length=100)
+    day = models.DateField()
+    down_seconds = models.FloatField(default=0)
+    outages = models.IntegerField(default=0)  # Outages that started this day
+    repairs = models.IntegerField(default=0)  # Outages that ended this day
+    repair_seconds = models.FloatField(default=0)  # Total length of the outages that ended this day
+
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['device', 'interface_name', 'day'], name='unique_availability_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='availability_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.interface_name} on {self.day}: {self.down_seconds:.0f}s down"
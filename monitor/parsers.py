@@ -0,0 +1,173 @@
+import re
+from typing import Dict, List, NamedTuple
+
+# The parsers run compiled patterns over the whole output instead of
+# splitting it line by line in Python, so large dumps stay cheap to parse.
+
+LINE_STATES = 'administratively down|up|down|deleted|testing|dormant'
+
+BRIEF_RE = re.compile(
+    r'^(?P<name>\S+)\s+(?P<ip>\S+)\s+(?:YES|NO)\s+\S+\s+'
+    r'(?P<status>' + LINE_STATES + r')\s+(?P<protocol>up|down|testing|dormant)\s*$',
+    re.MULTILINE,
+)
+
+HEADER_RE = re.compile(
+    r'^(?P<name>\S+) is (?P<status>' + LINE_STATES + r'), '
+    r'line protocol is (?P<protocol>\w+)',
+    re.MULTILINE,
+)
+# Every per-interface pattern starts with a literal so the engine can skip
+# ahead with a fast substring search instead of trying each position.
+DESCRIPTION_RE = re.compile(r'Description: ([^\r\n]*?)[ \t]*\r?$', re.MULTILINE)
+BANDWIDTH_RE = re.compile(r'MTU (\d+) bytes, BW (\d+) Kbit')
+QUEUE_DROPS_RE = re.compile(r'Input queue: \d+/\d+/(\d+)/\d+.*?Total output drops: (\d+)')
+COUNTERS_RE = re.compile(
+    r'input rate (\d+) bits/sec, (\d+) packets/sec.*\n'
+    r'.*output rate (\d+) bits/sec, (\d+) packets/sec.*\n'
+    r' +(\d+) packets input, (\d+) bytes.*\n'
+    r'(?:.*\n)*? +(\d+) input errors, (\d+) CRC.*\n'
+    r'(?:.*\n)*? +(\d+) packets output, (\d+) bytes.*\n'
+    r' +(\d+) output errors'
+)
+
+
+class InterfaceCounters(NamedTuple):
+    """One interface from ``show interfaces``"""
+    name: str
+    status: str
+    protocol: str
+    description: str
+    mtu: int
+    bandwidth_kbps: int
+    in_octets: int
+    out_octets: int
+    in_packets: int
+    out_packets: int
+    in_errors: int
+    crc_errors: int
+    out_errors: int
+    in_drops: int
+    out_drops: int
+    in_rate_bps: int
+    out_rate_bps: int
+    in_rate_pps: int
+    out_rate_pps: int
+
+
+class PortStatus(NamedTuple):
+    """One port from ``show interfaces status``"""
+    port: str
+    name: str
+    status: str
+    vlan: str
+    duplex: str
+    speed: str
+    type: str
+
+
+def interface_type(name: str) -> str:
+    """Classify an interface by its IOS name"""
+    if 'Ethernet' in name:
+        return 'ethernet'
+    if name.startswith('Serial'):
+        return 'serial'
+    return 'other'
+
+
+def normalize_status(status: str) -> str:
+    """Map IOS line states onto the up/down values the rest of the app uses"""
+    return 'up' if status == 'up' else 'down'
+
+
+def parse_ip_interface_brief(output: str) -> List[Dict]:
+    """Parse ``show ip interface brief`` into the handler get_interfaces() records.
+
+    Multi-word states are kept together: "administratively down" becomes
+    status 'down' with ``admin_down`` set, rather than being split across
+    the status and protocol columns.
+    """
+    interfaces = []
+    for match in BRIEF_RE.finditer(output):
+        name, ip, status, protocol = match.group('name', 'ip', 'status', 'protocol')
+        interfaces.append({
+            'name': name,
+            'ip_address': None if ip == 'unassigned' else ip,
+            'status': normalize_status(status),
+            'protocol': normalize_status(protocol),
+            'admin_down': status == 'administratively down',
+            'type': interface_type(name),
+        })
+    return interfaces
+
+
+def parse_show_interfaces(output: str) -> List[InterfaceCounters]:
+    """Parse ``show interfaces`` into per-interface counters and rates"""
+    headers = list(HEADER_RE.finditer(output))
+    records = []
+
+    for index, header in enumerate(headers):
+        start = header.end()
+        end = headers[index + 1].start() if index + 1 < len(headers) else len(output)
+
+        description = DESCRIPTION_RE.search(output, start, end)
+        bandwidth = BANDWIDTH_RE.search(output, start, end)
+        queue_drops = QUEUE_DROPS_RE.search(output, start, end)
+        counters = COUNTERS_RE.search(output, start, end)
+        values = [int(value) for value in counters.groups()] if counters else [0] * 11
+
+        records.append(InterfaceCounters(
+            name=header.group('name'),
+            status=header.group('status'),
+            protocol=header.group('protocol'),
+            description=description.group(1) if description else '',
+            mtu=int(bandwidth.group(1)) if bandwidth else 0,
+            bandwidth_kbps=int(bandwidth.group(2)) if bandwidth else 0,
+            in_octets=values[5],
+            out_octets=values[9],
+            in_packets=values[4],
+            out_packets=values[8],
+            in_errors=values[6],
+            crc_errors=values[7],
+            out_errors=values[10],
+            in_drops=int(queue_drops.group(1)) if queue_drops else 0,
+            out_drops=int(queue_drops.group(2)) if queue_drops else 0,
+            in_rate_bps=values[0],
+            out_rate_bps=values[2],
+            in_rate_pps=values[1],
+            out_rate_pps=values[3],
+        ))
+    return records
+
+
+def parse_interfaces_status(output: str) -> List[PortStatus]:
+    """Parse ``show interfaces status`` using the header's column offsets.
+
+    The Name column is free text (it may contain spaces or be empty), so
+    it is cut by position; the columns after it never contain spaces.
+    """
+    lines = output.splitlines()
+    header_index = next((i for i, line in enumerate(lines) if line.startswith('Port ')), None)
+    if header_index is None:
+        return []
+
+    header = lines[header_index]
+    name_col = header.index('Name')
+    status_col = header.index('Status')
+
+    ports = []
+    for line in lines[header_index + 1:]:
+        if not line.strip():
+            continue
+        fields = line[status_col:].split(None, 4)
+        fields += [''] * (5 - len(fields))
+        ports.append(PortStatus(
+            port=line[:name_col].strip(),
+            name=line[name_col:status_col].strip(),
+            status=fields[0],
+            vlan=fields[1],
+            duplex=fields[2],
+            speed=fields[3],
+            type=fields[4].strip(),
+        ))
+    return ports
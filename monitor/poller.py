@@ -0,0 +1,85 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class PollResult:
+    """Outcome of polling one device during a sweep"""
+
+    def __init__(self, device: str, interfaces: Optional[List[Dict]] = None,
+                 error: str = '', duration: float = 0.0, counters: Optional[Tuple[List, float]] = None):
+        self.device = device
+        self.interfaces = interfaces
+        self.error = error
+        self.duration = duration
+        self.counters = counters  # (counter records, wall-clock time they were read), if collected
+
+    @property
+    def ok(self) -> bool:
+        return self.interfaces is not None
+
+    def __repr__(self):
+        state = f'{len(self.interfaces)} interfaces' if self.ok else self.error
+        return f"<PollResult {self.device}: {state}>"
+
+
+def poll_devices(handlers: Dict[str, object], max_workers: int = 32, timeout: float = 30,
+                 poll: Callable = None) -> Dict[str, PollResult]:
+    """Poll many devices concurrently through a bounded thread pool.
+
+    ``handlers`` maps device name to a handler exposing ``get_interfaces()``.
+    ``poll`` may return the interfaces or an ``(interfaces, counters)`` pair.
+    Each device gets ``timeout`` seconds from the moment a worker picks it
+    up, so a hung box only costs its own slot and the sweep finishes in
+    roughly the time of the slowest responsive device. Results for devices
+    that time out are discarded even if they arrive later.
+    """
+    poll = poll or (lambda handler: handler.get_interfaces())
+    results: Dict[str, PollResult] = {}
+    started: Dict[str, float] = {}
+    started_lock = threading.Lock()
+
+    def run(name, handler):
+        with started_lock:
+            started[name] = time.monotonic()
+        return poll(handler)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(handlers) or 1)),
+                                  thread_name_prefix='monitor-poller')
+    try:
+        pending = {
+            executor.submit(run, name, handler): name
+            for name, handler in handlers.items()
+        }
+
+        while pending:
+            done, _ = wait(pending, timeout=min(1.0, timeout), return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+
+            for future in done:
+                name = pending.pop(future)
+                duration = now - started.get(name, now)
+                try:
+                    result = future.result()
+                    interfaces, counters = result if isinstance(result, tuple) else (result, None)
+                    results[name] = PollResult(name, interfaces, duration=duration, counters=counters)
+                except Exception as e:
+                    results[name] = PollResult(name, error=str(e) or e.__class__.__name__,
+                                               duration=duration)
+
+            with started_lock:
+                expired = [
+                    future for future, name in pending.items()
+                    if name in started and now - started[name] >= timeout
+                ]
+            for future in expired:
+                name = pending.pop(future)
+                results[name] = PollResult(name, error=f'Timed out after {timeout}s',
+                                           duration=now - started[name])
+    finally:
+        # Do not wait for hung workers; their results are already discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
@@ -0,0 +1,190 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Deque, Dict, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .collector import get_named_handler
+from .events import publish, publish_changes
+from .ingest import ingest_interfaces
+from .models import NetworkLog, RemediationJob
+from .serializers import serialize_job
+
+
+def apply_fix_result(device: str, interface_name: str, result: Dict) -> None:
+    """Log the outcome of a fix and, if it worked, mark the interface up in the snapshot"""
+    if result['success']:
+        # Reflect the fix right away instead of waiting for the next sweep, through the same
+        # path as a poll: the outage closes, open errors resolve and dampening sees the transition
+        ingest_interfaces([{'name': interface_name, 'status': 'up'}], device=device, cause='remediation')
+        return
+    log = NetworkLog.objects.create(
+        device=device,
+        interface_name=interface_name,
+        log_type='error',
+        message=result['message'],
+        resolved=False,
+    )
+    publish_changes(logs=[log])
+
+
+def run_job(job_id: int, handler=None) -> None:
+    """Claim a queued job, run the device handler's fix (or `handler`'s) and record the outcome"""
+    close_old_connections()
+    try:
+        claimed = RemediationJob.objects.filter(pk=job_id, status='queued').update(
+            status='running', started_at=timezone.now(),
+        )
+        if not claimed:
+            return
+        job = RemediationJob.objects.get(pk=job_id)
+        publish('job', serialize_job(job))
+
+        handler = handler or get_named_handler(job.device)
+        if handler is None:
+            result = {'success': False, 'message': f'Unknown device {job.device}', 'requires_manual_intervention': False}
+        else:
+            try:
+                result = handler.fix_interface(job.interface_name)
+            except Exception as e:
+                result = {'success': False, 'message': f'Fix failed: {e}', 'requires_manual_intervention': True}
+
+        apply_fix_result(job.device, job.interface_name, result)
+        job.status = 'succeeded' if result['success'] else 'failed'
+        job.message = result['message']
+        job.requires_manual_intervention = result.get('requires_manual_intervention', False)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'message', 'requires_manual_intervention', 'finished_at'])
+        publish('job', serialize_job(job))
+    finally:
+        close_old_connections()
+
+
+class RemediationQueue:
+    """Runs remediation jobs on a bounded pool of worker threads.
+
+    At most ``per_device`` jobs run against one device at a time; the
+    others wait in that device's line without holding a worker, so one
+    slow device cannot starve fixes elsewhere. Once ``max_pending`` jobs
+    are waiting or running, further submissions are refused.
+    """
+
+    def __init__(self, workers: int = None, per_device: int = None, max_pending: int = None,
+                 run: Callable[[int], None] = run_job):
+        self.workers = workers or settings.REMEDIATION_WORKERS
+        self.per_device = per_device or settings.REMEDIATION_PER_DEVICE
+        self.max_pending = max_pending or settings.REMEDIATION_QUEUE_SIZE
+        self.run = run
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='monitor-remediation')
+        self._running: Dict[str, int] = {}
+        self._waiting: Dict[str, Deque[int]] = {}
+        self._idle = threading.Condition()
+
+    def full(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def submit(self, job_id: int, device: str) -> bool:
+        """Queue a job; False if the queue is full"""
+        with self._idle:
+            if self.full():
+                return False
+            self.pending += 1
+            if self._running.get(device, 0) < self.per_device:
+                self._running[device] = self._running.get(device, 0) + 1
+                self._executor.submit(self._work, job_id, device)
+            else:
+                self._waiting.setdefault(device, deque()).append(job_id)
+        return True
+
+    def _work(self, job_id: int, device: str):
+        try:
+            self.run(job_id)
+        except Exception as e:
+            print(f"[REMEDIATION] Job {job_id} failed: {e}")
+
+        with self._idle:
+            self.pending -= 1
+            waiting = self._waiting.get(device)
+            if waiting:
+                # Hand the device's slot to its next job, behind other devices' work
+                self._executor.submit(self._work, waiting.popleft(), device)
+                if not waiting:
+                    del self._waiting[device]
+            else:
+                self._running[device] -= 1
+                if not self._running[device]:
+                    del self._running[device]
+            self._idle.notify_all()
+
+    def join(self, timeout: float = None) -> bool:
+        """Wait until every submitted job has finished; False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self.pending == 0, timeout)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_remediation_queue() -> RemediationQueue:
+    """Return the process-wide remediation queue, configured from settings"""
+    global _queue
+
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = RemediationQueue()
+    return _queue
+
+
+def expire_stale_jobs(device: str, interface_name: str) -> None:
+    """Fail active jobs older than REMEDIATION_JOB_TIMEOUT, e.g. left behind by a restarted worker"""
+    cutoff = timezone.now() - timedelta(seconds=settings.REMEDIATION_JOB_TIMEOUT)
+    RemediationJob.objects.filter(
+        device=device,
+        interface_name=interface_name,
+        status__in=RemediationJob.ACTIVE_STATUSES,
+        created_at__lt=cutoff,
+    ).update(status='failed', message='Abandoned: the fix did not finish in time', finished_at=timezone.now())
+
+
+def submit_job(job: RemediationJob) -> None:
+    if not get_remediation_queue().submit(job.pk, job.device):
+        job.status = 'failed'
+        job.message = 'Remediation queue is full, try again shortly'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'message', 'finished_at'])
+        publish('job', serialize_job(job))
+
+
+def enqueue_fix(device: str, interface_name: str, requested_by: str = '') -> Tuple[RemediationJob, bool]:
+    """Queue a fix of one interface; returns (job, created).
+
+    A fix already queued or running for the interface is returned instead
+    of starting a second one. The job is handed to the worker pool once
+    the surrounding transaction commits.
+    """
+    expire_stale_jobs(device, interface_name)
+    active = RemediationJob.objects.filter(
+        device=device, interface_name=interface_name, status__in=RemediationJob.ACTIVE_STATUSES,
+    )
+
+    job = active.first()
+    if job is not None:
+        return job, False
+
+    try:
+        with transaction.atomic():
+            job = RemediationJob.objects.create(device=device, interface_name=interface_name, requested_by=requested_by)
+    except IntegrityError:
+        # Another request queued the same interface between our check and insert
+        return active.get(), False
+
+    transaction.on_commit(lambda: submit_job(job))
+    publish('job', serialize_job(job))
+    return job, True
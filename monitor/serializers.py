@@ -0,0 +1,48 @@
+from typing import Dict
+
+from .models import NetworkInterface, NetworkLog, RemediationJob
+
+
+def serialize_interface(interface: NetworkInterface) -> Dict:
+    """JSON shape of an interface as served to the dashboard"""
+    return {
+        'device': interface.device,
+        'name': interface.interface_name,
+        'type': interface.interface_type,
+        'ip_address': interface.ip_address,
+        'status': interface.status,
+        'flapping': interface.flapping,
+        'version': interface.version,
+        'last_changed': interface.last_changed.isoformat() if interface.last_changed else None,
+    }
+
+
+def serialize_log(log: NetworkLog) -> Dict:
+    """JSON shape of a log entry as served to the dashboard"""
+    return {
+        'id': log.id,
+        'device': log.device,
+        'interface_name': log.interface_name,
+        'log_type': log.log_type,
+        'message': log.message,
+        'timestamp': log.timestamp.isoformat(),
+        'last_seen': log.last_seen.isoformat() if log.last_seen else None,
+        'count': log.count,
+        'resolved': log.resolved,
+    }
+
+
+def serialize_job(job: RemediationJob) -> Dict:
+    """JSON shape of a remediation job as served to the dashboard"""
+    return {
+        'id': job.id,
+        'device': job.device,
+        'interface_name': job.interface_name,
+        'status': job.status,
+        'message': job.message,
+        'requires_manual_intervention': job.requires_manual_intervention,
+        'requested_by': job.requested_by,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
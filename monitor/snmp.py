@@ -0,0 +1,468 @@
+import asyncio
+import itertools
+import os
+import random
+import socket
+import time
+from typing import Dict, List, Tuple
+
+from .parsers import InterfaceCounters, normalize_status
+from .poller import PollResult
+
+# BER tags used by SNMPv2c
+INTEGER = 0x02
+OCTET_STRING = 0x04
+NULL = 0x05
+OBJECT_IDENTIFIER = 0x06
+SEQUENCE = 0x30
+IP_ADDRESS = 0x40
+COUNTER32 = 0x41
+GAUGE32 = 0x42
+TIMETICKS = 0x43
+COUNTER64 = 0x46
+NO_SUCH_OBJECT = 0x80
+NO_SUCH_INSTANCE = 0x81
+END_OF_MIB_VIEW = 0x82
+
+GET_REQUEST = 0xA0
+GET_NEXT_REQUEST = 0xA1
+GET_RESPONSE = 0xA2
+GET_BULK_REQUEST = 0xA5
+
+SNMP_V2C = 1
+TOO_BIG = 1
+
+# Tags without a value in a response varbind
+EXCEPTIONS = {NO_SUCH_OBJECT, NO_SUCH_INSTANCE, END_OF_MIB_VIEW}
+
+# IF-MIB / IP-MIB / EtherLike-MIB columns, walked together in one GETBULK sequence
+IF_COLUMNS = {
+    'descr': '1.3.6.1.2.1.2.2.1.2',
+    'type': '1.3.6.1.2.1.2.2.1.3',
+    'mtu': '1.3.6.1.2.1.2.2.1.4',
+    'speed': '1.3.6.1.2.1.2.2.1.5',
+    'admin_status': '1.3.6.1.2.1.2.2.1.7',
+    'oper_status': '1.3.6.1.2.1.2.2.1.8',
+    'in_octets': '1.3.6.1.2.1.2.2.1.10',
+    'in_discards': '1.3.6.1.2.1.2.2.1.13',
+    'in_errors': '1.3.6.1.2.1.2.2.1.14',
+    'out_octets': '1.3.6.1.2.1.2.2.1.16',
+    'out_discards': '1.3.6.1.2.1.2.2.1.19',
+    'out_errors': '1.3.6.1.2.1.2.2.1.20',
+    'hc_in_octets': '1.3.6.1.2.1.31.1.1.1.6',
+    'hc_in_ucast': '1.3.6.1.2.1.31.1.1.1.7',
+    'hc_in_mcast': '1.3.6.1.2.1.31.1.1.1.8',
+    'hc_in_bcast': '1.3.6.1.2.1.31.1.1.1.9',
+    'hc_out_octets': '1.3.6.1.2.1.31.1.1.1.10',
+    'hc_out_ucast': '1.3.6.1.2.1.31.1.1.1.11',
+    'hc_out_mcast': '1.3.6.1.2.1.31.1.1.1.12',
+    'hc_out_bcast': '1.3.6.1.2.1.31.1.1.1.13',
+    'high_speed': '1.3.6.1.2.1.31.1.1.1.15',
+    'alias': '1.3.6.1.2.1.31.1.1.1.18',
+    'fcs_errors': '1.3.6.1.2.1.10.7.2.1.3',
+    'ip_if_index': '1.3.6.1.2.1.4.20.1.2',
+}
+
+# ifType values mapped onto the interface types the dashboard knows
+IF_TYPES = {6: 'ethernet', 22: 'serial', 23: 'serial', 32: 'serial', 117: 'ethernet'}
+
+SNMP_PORT = 161
+
+
+class SnmpError(Exception):
+    """Raised on malformed SNMP messages, error responses and timeouts"""
+
+
+def encode_length(length: int) -> bytes:
+    if length < 0x80:
+        return bytes([length])
+    raw = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes([0x80 | len(raw)]) + raw
+
+
+def encode_tlv(tag: int, payload: bytes) -> bytes:
+    return bytes([tag]) + encode_length(len(payload)) + payload
+
+
+def encode_integer(value: int, tag: int = INTEGER) -> bytes:
+    """Two's complement INTEGER; unsigned application types get a leading zero when needed"""
+    length = max(1, (value.bit_length() + 8) // 8)
+    return encode_tlv(tag, value.to_bytes(length, 'big', signed=True))
+
+
+def encode_oid(oid: str) -> bytes:
+    parts = [int(part) for part in oid.strip('.').split('.')]
+    if len(parts) < 2:
+        raise SnmpError(f'Invalid OID {oid}')
+
+    payload = bytearray([parts[0] * 40 + parts[1]])
+    for part in parts[2:]:
+        chunk = [part & 0x7F]
+        part >>= 7
+        while part:
+            chunk.append(0x80 | (part & 0x7F))
+            part >>= 7
+        payload.extend(reversed(chunk))
+    return encode_tlv(OBJECT_IDENTIFIER, bytes(payload))
+
+
+def encode_value(tag: int, value=None) -> bytes:
+    """Encode one varbind value; tags without a value (NULL, exceptions) ignore it"""
+    if tag in (INTEGER, COUNTER32, GAUGE32, TIMETICKS, COUNTER64):
+        return encode_integer(value, tag)
+    if tag == OCTET_STRING:
+        return encode_tlv(tag, value.encode('utf-8') if isinstance(value, str) else value)
+    if tag == IP_ADDRESS:
+        return encode_tlv(tag, socket.inet_aton(value))
+    if tag == OBJECT_IDENTIFIER:
+        return encode_oid(value)
+    return encode_tlv(tag, b'')
+
+
+def encode_message(community: str, pdu_type: int, request_id: int,
+                   varbinds: List[Tuple[str, Tuple[int, object]]],
+                   error_status: int = 0, error_index: int = 0) -> bytes:
+    """SNMPv2c message. For GETBULK, error_status/error_index carry non-repeaters/max-repetitions."""
+    bindings = b''.join(
+        encode_tlv(SEQUENCE, encode_oid(oid) + encode_value(*value))
+        for oid, value in varbinds
+    )
+    pdu = encode_tlv(pdu_type, (
+        encode_integer(request_id)
+        + encode_integer(error_status)
+        + encode_integer(error_index)
+        + encode_tlv(SEQUENCE, bindings)
+    ))
+    return encode_tlv(SEQUENCE, encode_integer(SNMP_V2C) + encode_value(OCTET_STRING, community) + pdu)
+
+
+def decode_tlv(data: bytes, offset: int = 0) -> Tuple[int, bytes, int]:
+    """Return (tag, payload, offset after the TLV)"""
+    try:
+        tag = data[offset]
+        length = data[offset + 1]
+        offset += 2
+        if length & 0x80:
+            size = length & 0x7F
+            length = int.from_bytes(data[offset:offset + size], 'big')
+            offset += size
+    except IndexError:
+        raise SnmpError('Truncated BER data')
+
+    end = offset + length
+    if end > len(data):
+        raise SnmpError('Truncated BER data')
+    return tag, data[offset:end], end
+
+
+def decode_oid(payload: bytes) -> str:
+    if not payload:
+        raise SnmpError('Empty OID')
+    first = payload[0]
+    parts = [min(first // 40, 2), first - 40 * min(first // 40, 2)]
+
+    value = 0
+    for byte in payload[1:]:
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            parts.append(value)
+            value = 0
+    return '.'.join(str(part) for part in parts)
+
+
+def decode_value(tag: int, payload: bytes):
+    if tag == INTEGER:
+        return int.from_bytes(payload, 'big', signed=True)
+    if tag in (COUNTER32, GAUGE32, TIMETICKS, COUNTER64):
+        return int.from_bytes(payload, 'big')
+    if tag == OCTET_STRING:
+        return payload.decode('utf-8', errors='replace')
+    if tag == IP_ADDRESS:
+        return socket.inet_ntoa(payload)
+    if tag == OBJECT_IDENTIFIER:
+        return decode_oid(payload)
+    return None
+
+
+def decode_message(data: bytes) -> Dict:
+    """Decode an SNMPv2c message into its header fields and (oid, (tag, value)) varbinds"""
+    tag, message, _ = decode_tlv(data)
+    if tag != SEQUENCE:
+        raise SnmpError('Not an SNMP message')
+
+    _, version, offset = decode_tlv(message)
+    _, community, offset = decode_tlv(message, offset)
+    pdu_type, pdu, _ = decode_tlv(message, offset)
+
+    _, request_id, offset = decode_tlv(pdu)
+    _, error_status, offset = decode_tlv(pdu, offset)
+    _, error_index, offset = decode_tlv(pdu, offset)
+    _, bindings, _ = decode_tlv(pdu, offset)
+
+    varbinds = []
+    offset = 0
+    while offset < len(bindings):
+        _, binding, offset = decode_tlv(bindings, offset)
+        _, oid, value_offset = decode_tlv(binding)
+        value_tag, value, _ = decode_tlv(binding, value_offset)
+        varbinds.append((decode_oid(oid), (value_tag, decode_value(value_tag, value))))
+
+    return {
+        'version': int.from_bytes(version, 'big'),
+        'community': community.decode('utf-8', errors='replace'),
+        'pdu_type': pdu_type,
+        'request_id': int.from_bytes(request_id, 'big', signed=True),
+        'error_status': int.from_bytes(error_status, 'big'),
+        'error_index': int.from_bytes(error_index, 'big'),
+        'varbinds': varbinds,
+    }
+
+
+class SnmpClient(asyncio.DatagramProtocol):
+    """SNMPv2c client multiplexing requests to many agents over one UDP socket.
+
+    Responses are matched to requests by request-id and source address, so
+    every device of a sweep can have requests in flight at the same time.
+    """
+
+    def __init__(self):
+        self.transport = None
+        self.pending: Dict[int, Tuple[Tuple, asyncio.Future]] = {}
+        self._request_ids = itertools.count(random.randint(1, 1 << 30))
+
+    @classmethod
+    async def open(cls) -> 'SnmpClient':
+        loop = asyncio.get_running_loop()
+        _, client = await loop.create_datagram_endpoint(cls, local_addr=('0.0.0.0', 0))
+        return client
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            message = decode_message(data)
+        except (SnmpError, ValueError):
+            return
+        address, future = self.pending.get(message['request_id'], (None, None))
+        if future is not None and not future.done() and tuple(addr[:2]) == address:
+            future.set_result(message)
+
+    def error_received(self, exc):
+        # The socket is shared by every device, and an ICMP error does not say which
+        # request it belongs to: leave each request to its own timeout and retries
+        print(f"[SNMP] Socket error: {exc}")
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    async def request(self, address: Tuple[str, int], community: str, pdu_type: int, oids: List[str],
+                      non_repeaters: int = 0, max_repetitions: int = 0,
+                      timeout: float = 2.0, retries: int = 1) -> Dict:
+        """Send one request and wait for the matching response, retrying on timeout"""
+        loop = asyncio.get_running_loop()
+        varbinds = [(oid, (NULL, None)) for oid in oids]
+
+        for _ in range(retries + 1):
+            request_id = next(self._request_ids) & 0x7FFFFFFF
+            future = loop.create_future()
+            self.pending[request_id] = (address, future)
+            try:
+                self.transport.sendto(
+                    encode_message(community, pdu_type, request_id, varbinds, non_repeaters, max_repetitions),
+                    address,
+                )
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                continue
+            finally:
+                self.pending.pop(request_id, None)
+
+        raise SnmpError(f'No response from {address[0]}:{address[1]}')
+
+    async def bulk_walk(self, address: Tuple[str, int], community: str, columns: List[str],
+                        max_repetitions: int = 10, timeout: float = 2.0, retries: int = 1) -> Dict[str, Dict[str, object]]:
+        """Walk several table columns side by side with GETBULK; return {column: {index: value}}"""
+        results = {column: {} for column in columns}
+        cursor = {column: column for column in columns}
+        active = list(columns)
+
+        while active:
+            response = await self.request(address, community, GET_BULK_REQUEST, [cursor[c] for c in active],
+                                          0, max_repetitions, timeout, retries)
+            if response['error_status'] == TOO_BIG and max_repetitions > 1:
+                max_repetitions //= 2
+                continue
+            if response['error_status']:
+                raise SnmpError(f"{address[0]} returned error-status {response['error_status']}")
+
+            # Varbinds come back row by row, one per requested column
+            finished = set()
+            for position, (oid, (tag, value)) in enumerate(response['varbinds']):
+                column = active[position % len(active)]
+                if column in finished:
+                    continue
+                if tag in EXCEPTIONS or not oid.startswith(column + '.'):
+                    finished.add(column)
+                    continue
+                results[column][oid[len(column) + 1:]] = value
+                cursor[column] = oid
+
+            # A column the agent returned nothing for would otherwise be requested forever
+            returned = {active[position % len(active)] for position in range(len(response['varbinds']))}
+            active = [column for column in active if column not in finished and column in returned]
+
+        return results
+
+
+class SnmpHandler:
+    """Handler polling interface state and counters over SNMPv2c (IF-MIB)"""
+
+    def __init__(self, host: str = None, port: int = SNMP_PORT, community: str = None,
+                 timeout: float = None, retries: int = 1, max_repetitions: int = 10):
+        self.host = host or os.getenv('CISCO_HOST', '192.168.1.1')
+        self.port = port
+        self.community = community or os.getenv('SNMP_COMMUNITY', 'public')
+        self.timeout = timeout or float(os.getenv('SNMP_TIMEOUT', '2'))
+        self.retries = retries
+        self.max_repetitions = max_repetitions
+
+    async def walk(self, client: SnmpClient) -> Dict[str, Dict[str, object]]:
+        """Walk all interface columns of this device; keys are the IF_COLUMNS names"""
+        loop = asyncio.get_running_loop()
+        info = await loop.getaddrinfo(self.host, self.port, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+        address = info[0][4][:2]
+
+        columns = await client.bulk_walk(address, self.community, list(IF_COLUMNS.values()),
+                                         self.max_repetitions, self.timeout, self.retries)
+        return {name: columns[oid] for name, oid in IF_COLUMNS.items()}
+
+    async def poll(self, client: SnmpClient) -> Tuple[List[Dict], List[InterfaceCounters]]:
+        """Interfaces (the get_interfaces() records) and counters from one walk"""
+        table = await self.walk(client)
+        return interfaces_from_table(table), counters_from_table(table)
+
+    def _run(self) -> Tuple[List[Dict], List[InterfaceCounters]]:
+        async def run():
+            client = await SnmpClient.open()
+            try:
+                return await self.poll(client)
+            finally:
+                client.close()
+        return asyncio.run(run())
+
+    def get_interfaces(self) -> List[Dict]:
+        """Get list of interfaces from the device's IF-MIB"""
+        return self._run()[0]
+
+    def get_counters(self) -> List[InterfaceCounters]:
+        """Get cumulative traffic and error counters from the device's IF-MIB"""
+        return self._run()[1]
+
+    def fix_interface(self, interface_name: str) -> Dict:
+        """Interfaces cannot be reconfigured over read-only SNMP"""
+        return {
+            'success': False,
+            'message': f'Cannot fix {interface_name} over SNMP - poll this device over SSH to remediate',
+            'requires_manual_intervention': True,
+        }
+
+
+def _line_status(admin_status, oper_status) -> str:
+    if admin_status == 2:
+        return 'administratively down'
+    return 'up' if oper_status == 1 else 'down'
+
+
+def interfaces_from_table(table: Dict[str, Dict[str, object]]) -> List[Dict]:
+    """Build get_interfaces() records from walked IF-MIB columns"""
+    addresses = {}
+    for ip_address, if_index in table['ip_if_index'].items():
+        addresses.setdefault(str(if_index), ip_address)
+
+    interfaces = []
+    for index, name in table['descr'].items():
+        status = _line_status(table['admin_status'].get(index), table['oper_status'].get(index))
+        interfaces.append({
+            'name': name,
+            'ip_address': addresses.get(index),
+            'status': normalize_status(status),
+            'protocol': 'up' if table['oper_status'].get(index) == 1 else 'down',
+            'admin_down': status == 'administratively down',
+            'type': IF_TYPES.get(table['type'].get(index), 'other'),
+        })
+    return interfaces
+
+
+def counters_from_table(table: Dict[str, Dict[str, object]]) -> List[InterfaceCounters]:
+    """Build counter records from walked IF-MIB columns, preferring 64-bit counters"""
+    def value(column, index):
+        return table[column].get(index) or 0
+
+    records = []
+    for index, name in table['descr'].items():
+        status = _line_status(table['admin_status'].get(index), table['oper_status'].get(index))
+        high_speed = value('high_speed', index)
+        records.append(InterfaceCounters(
+            name=name,
+            status=status,
+            protocol='up' if table['oper_status'].get(index) == 1 else 'down',
+            description=table['alias'].get(index, ''),
+            mtu=value('mtu', index),
+            bandwidth_kbps=high_speed * 1000 if high_speed else value('speed', index) // 1000,
+            in_octets=table['hc_in_octets'].get(index, value('in_octets', index)),
+            out_octets=table['hc_out_octets'].get(index, value('out_octets', index)),
+            in_packets=value('hc_in_ucast', index) + value('hc_in_mcast', index) + value('hc_in_bcast', index),
+            out_packets=value('hc_out_ucast', index) + value('hc_out_mcast', index) + value('hc_out_bcast', index),
+            in_errors=value('in_errors', index),
+            crc_errors=value('fcs_errors', index),
+            out_errors=value('out_errors', index),
+            in_drops=value('in_discards', index),
+            out_drops=value('out_discards', index),
+            in_rate_bps=0,
+            out_rate_bps=0,
+            in_rate_pps=0,
+            out_rate_pps=0,
+        ))
+    return records
+
+
+async def apoll_snmp_devices(handlers: Dict[str, SnmpHandler], timeout: float = 30,
+                             max_in_flight: int = 256) -> Dict[str, PollResult]:
+    """Poll many SNMP devices concurrently from the running event loop and one UDP socket.
+
+    Each device gets ``timeout`` seconds for its whole walk; at most
+    ``max_in_flight`` walks run at once.
+    """
+    if not handlers:
+        return {}
+
+    client = await SnmpClient.open()
+    limit = asyncio.Semaphore(max_in_flight)
+
+    async def poll_one(name, handler):
+        async with limit:
+            started = time.monotonic()
+            try:
+                interfaces, counters = await asyncio.wait_for(handler.poll(client), timeout)
+            except asyncio.TimeoutError:
+                return PollResult(name, error=f'Timed out after {timeout}s', duration=time.monotonic() - started)
+            except Exception as e:
+                return PollResult(name, error=str(e) or e.__class__.__name__, duration=time.monotonic() - started)
+            return PollResult(name, interfaces, duration=time.monotonic() - started,
+                              counters=(counters, time.time()))
+
+    try:
+        results = await asyncio.gather(*(poll_one(name, handler) for name, handler in handlers.items()))
+    finally:
+        client.close()
+    return {result.device: result for result in results}
+
+
+def poll_snmp_devices(handlers: Dict[str, SnmpHandler], timeout: float = 30,
+                      max_in_flight: int = 256) -> Dict[str, PollResult]:
+    """apoll_snmp_devices() on a fresh event loop, for synchronous callers"""
+    if not handlers:
+        return {}
+    return asyncio.run(apoll_snmp_devices(handlers, timeout, max_in_flight))
@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no session to a device frees up within the wait timeout"""
+
+
+class _PooledSession:
+    """An authenticated SSH client plus the time it was last handed back"""
+
+    def __init__(self, client):
+        self.client = client
+        self.last_used = time.monotonic()
+
+    def is_alive(self) -> bool:
+        """Check the transport is still up before handing the session out"""
+        try:
+            transport = self.client.get_transport()
+            if transport is None or not transport.is_active():
+                return False
+            transport.send_ignore()
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+def _paramiko_client_factory(host: str, port: int, username: str, password: str,
+                             timeout: float, keepalive: int):
+    """Open and authenticate a paramiko SSH client"""
+    import paramiko
+
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(
+        hostname=host,
+        port=port,
+        username=username,
+        password=password,
+        timeout=timeout,
+        look_for_keys=False,
+        allow_agent=False,
+    )
+    if keepalive:
+        client.get_transport().set_keepalive(keepalive)
+    return client
+
+
+class SSHConnectionPool:
+    """Process-wide pool of authenticated SSH sessions keyed by host and credentials.
+
+    Each device gets at most ``max_per_host`` concurrent sessions. Idle
+    sessions are reused after a liveness check and closed once they have
+    been idle for longer than ``idle_ttl`` seconds.
+    """
+
+    def __init__(self, max_per_host: int = 2, idle_ttl: float = 300, keepalive: int = 30,
+                 connect_timeout: float = 10, acquire_timeout: float = 30,
+                 client_factory: Callable = None):
+        self.max_per_host = max_per_host
+        self.idle_ttl = idle_ttl
+        self.keepalive = keepalive
+        self.connect_timeout = connect_timeout
+        self.acquire_timeout = acquire_timeout
+        self.client_factory = client_factory or _paramiko_client_factory
+
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple, List[_PooledSession]] = {}
+        self._slots: Dict[Tuple, threading.BoundedSemaphore] = {}
+
+    @staticmethod
+    def make_key(host: str, username: str, password: str, port: int = 22) -> Tuple:
+        return (host, port, username, password)
+
+    def _slot(self, key: Tuple) -> threading.BoundedSemaphore:
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return self._slots[key]
+
+    def _checkout(self, key: Tuple) -> _PooledSession:
+        """Return a live idle session for key, or open a new one"""
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                session = idle.pop() if idle else None
+
+            if session is None:
+                host, port, username, password = key
+                client = self.client_factory(
+                    host, port, username, password, self.connect_timeout, self.keepalive
+                )
+                return _PooledSession(client)
+
+            if session.is_alive():
+                return session
+            session.close()
+
+    def _checkin(self, key: Tuple, session: _PooledSession):
+        session.last_used = time.monotonic()
+        with self._lock:
+            self._idle.setdefault(key, []).append(session)
+
+    @contextmanager
+    def session(self, host: str, username: str, password: str, port: int = 22):
+        """Borrow an authenticated SSH client for the duration of the block.
+
+        If the block raises, the session is assumed broken and is closed
+        instead of being returned to the pool.
+        """
+        key = self.make_key(host, username, password, port)
+        slot = self._slot(key)
+
+        if not slot.acquire(timeout=self.acquire_timeout):
+            raise PoolExhaustedError(f'No SSH session to {host} available after {self.acquire_timeout}s')
+
+        try:
+            self.reap_idle()
+            session = self._checkout(key)
+            try:
+                yield session.client
+            except BaseException:
+                session.close()
+                raise
+            else:
+                self._checkin(key, session)
+        finally:
+            slot.release()
+
+    def reap_idle(self) -> int:
+        """Close sessions idle for longer than idle_ttl; return how many were closed"""
+        cutoff = time.monotonic() - self.idle_ttl
+        expired = []
+
+        with self._lock:
+            for key, sessions in self._idle.items():
+                keep = []
+                for session in sessions:
+                    (expired if session.last_used < cutoff else keep).append(session)
+                self._idle[key] = keep
+
+        for session in expired:
+            session.close()
+        return len(expired)
+
+    def close_host(self, host: str, username: str, password: str, port: int = 22):
+        """Close all idle sessions to one device"""
+        key = self.make_key(host, username, password, port)
+        with self._lock:
+            sessions = self._idle.pop(key, [])
+        for session in sessions:
+            session.close()
+
+    def close_all(self):
+        """Close every idle session in the pool"""
+        with self._lock:
+            sessions = [session for idle in self._idle.values() for session in idle]
+            self._idle.clear()
+        for session in sessions:
+            session.close()
+
+    def idle_count(self, host: str = None) -> int:
+        with self._lock:
+            return sum(
+                len(sessions) for key, sessions in self._idle.items()
+                if host is None or key[0] == host
+            )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_ssh_pool() -> SSHConnectionPool:
+    """Return the process-wide SSH pool, configured from the environment"""
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SSHConnectionPool(
+                    max_per_host=int(os.getenv('SSH_POOL_MAX_PER_HOST', '2')),
+                    idle_ttl=float(os.getenv('SSH_POOL_IDLE_TTL', '300')),
+                    keepalive=int(os.getenv('SSH_KEEPALIVE_INTERVAL', '30')),
+                )
+    return _pool
@@ -0,0 +1,277 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+
+from .models import NetworkInterface
+from .serializers import serialize_interface
+
+# (version, interfaces, full): interfaces changed after `since`, or all of them when full
+Snapshot = Tuple[int, List[Dict], bool]
+Key = Tuple[str, str]  # (device, interface name)
+
+
+def interface_key(interface: Dict) -> str:
+    return f"{interface['device']}\x00{interface['name']}"
+
+
+def select(version: int, interfaces: Iterable[Dict], since: int = None, deleted: int = 0) -> Snapshot:
+    """Pick the interfaces a client at `since` is missing, in the table's order.
+
+    A client ahead of the store, or one that has not seen the latest
+    deletion (version `deleted`), gets everything: a delta cannot drop rows.
+    """
+    interfaces = sorted(interfaces, key=lambda interface: (interface['device'], interface['name']))
+    if since is None or since > version or since < deleted:
+        return version, interfaces, True
+    return version, [interface for interface in interfaces if interface['version'] > since], False
+
+
+class StateStore(ABC):
+    """Latest interface snapshot and its state version, shared by the collector and every view.
+
+    The collector (and remediation) apply each committed change together
+    with its state version as one atomic write; views read the snapshot
+    without touching the database. Every interface remembers the version
+    it was last written or removed at, so a change that arrives late never
+    overwrites a newer one.
+    """
+
+    @abstractmethod
+    def version(self) -> int:
+        """State version of the latest change applied"""
+
+    @abstractmethod
+    def snapshot(self, since: int = None) -> Snapshot:
+        """The version plus the interfaces a client at `since` is missing, read together"""
+
+    @abstractmethod
+    def apply(self, version: int, interfaces: List[Dict]) -> None:
+        """Store changed interfaces newer than the stored ones, and advance the version to `version` if it is newer"""
+
+    @abstractmethod
+    def remove(self, version: int, keys: List[Key]) -> None:
+        """Drop the interfaces deleted at `version`, and advance the version likewise"""
+
+    @abstractmethod
+    def load(self, version: int, interfaces: List[Dict], deleted: int = 0) -> bool:
+        """Replace the whole snapshot, unless the store already holds `version` or newer; True if replaced.
+
+        `deleted` is the version of the latest deletion the snapshot reflects.
+        """
+
+
+class LocMemStateStore(StateStore):
+    """Store in this process's memory: for tests and single-web-process setups"""
+
+    def __init__(self):
+        self._version = 0
+        self._loaded = 0  # version of the last full load, which covers every older change
+        self._interfaces: Dict[str, Dict] = {}
+        self._versions: Dict[str, int] = {}  # key -> version it was last written or removed at
+        self._deleted = 0  # version of the latest deletion
+        self._lock = threading.Lock()
+
+    def version(self) -> int:
+        return self._version
+
+    def snapshot(self, since: int = None) -> Snapshot:
+        with self._lock:
+            return select(self._version, list(self._interfaces.values()), since, self._deleted)
+
+    def _newer(self, key: str, version: int) -> bool:
+        if version <= self._versions.get(key, self._loaded):
+            return False
+        self._versions[key] = version
+        return True
+
+    def apply(self, version: int, interfaces: List[Dict]) -> None:
+        with self._lock:
+            for interface in interfaces:
+                key = interface_key(interface)
+                if self._newer(key, interface['version']):
+                    self._interfaces[key] = interface
+            self._version = max(self._version, version)
+
+    def remove(self, version: int, keys: List[Key]) -> None:
+        with self._lock:
+            for device, name in keys:
+                key = interface_key({'device': device, 'name': name})
+                if self._newer(key, version):
+                    self._interfaces.pop(key, None)
+            self._version = max(self._version, version)
+            self._deleted = max(self._deleted, version)
+
+    def load(self, version: int, interfaces: List[Dict], deleted: int = 0) -> bool:
+        with self._lock:
+            if self._version >= version and self._interfaces:
+                return False
+            self._interfaces = {interface_key(interface): interface for interface in interfaces}
+            self._versions = {}
+            self._version = self._loaded = version
+            self._deleted = deleted
+            return True
+
+
+# Write each interface only if its version is newer than the one it was last written or removed
+# at (or, failing that, than the last full load), then advance the version keys only forwards.
+# KEYS: version, interfaces, versions, loaded, deleted; ARGV: state version, then (key, version,
+# JSON or '' to remove) per interface
+APPLY_SCRIPT = """
+local loaded = tonumber(redis.call('GET', KEYS[4]) or '0')
+for i = 2, #ARGV, 3 do
+    local current = tonumber(redis.call('HGET', KEYS[3], ARGV[i]) or loaded)
+    if tonumber(ARGV[i + 1]) > current then
+        redis.call('HSET', KEYS[3], ARGV[i], ARGV[i + 1])
+        if ARGV[i + 2] == '' then
+            redis.call('HDEL', KEYS[2], ARGV[i])
+            if tonumber(ARGV[i + 1]) > tonumber(redis.call('GET', KEYS[5]) or '0') then
+                redis.call('SET', KEYS[5], ARGV[i + 1])
+            end
+        else
+            redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 2])
+        end
+    end
+end
+if tonumber(ARGV[1]) > tonumber(redis.call('GET', KEYS[1]) or '0') then
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+"""
+
+
+class RedisStateStore(StateStore):
+    """Store in Redis: one hash of serialized interfaces plus a version key, shared by every worker"""
+
+    def __init__(self, url: str, prefix: str = 'netmon:state'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('redis is required for the Redis state store (pip install redis)')
+        self.redis_module = redis
+        self.client = redis.Redis.from_url(url)
+        self.version_key = f'{prefix}:version'
+        self.interfaces_key = f'{prefix}:interfaces'
+        self.versions_key = f'{prefix}:versions'
+        self.loaded_key = f'{prefix}:loaded'
+        self.deleted_key = f'{prefix}:deleted'
+        self.apply_script = self.client.register_script(APPLY_SCRIPT)
+
+    def version(self) -> int:
+        return int(self.client.get(self.version_key) or 0)
+
+    def snapshot(self, since: int = None) -> Snapshot:
+        # Read the keys in one MULTI so the versions match the interfaces
+        pipe = self.client.pipeline(transaction=True)
+        pipe.get(self.version_key)
+        pipe.get(self.deleted_key)
+        pipe.hvals(self.interfaces_key)
+        version, deleted, values = pipe.execute()
+        return select(int(version or 0), [json.loads(value) for value in values], since, int(deleted or 0))
+
+    def _run(self, version: int, entries: List[Tuple[str, int, str]]) -> None:
+        # One script call: Redis runs it atomically, compare and write together
+        args = [version]
+        for entry in entries:
+            args.extend(entry)
+        self.apply_script(
+            keys=[self.version_key, self.interfaces_key, self.versions_key, self.loaded_key, self.deleted_key],
+            args=args,
+        )
+
+    def apply(self, version: int, interfaces: List[Dict]) -> None:
+        self._run(version, [
+            (interface_key(interface), interface['version'], json.dumps(interface)) for interface in interfaces
+        ])
+
+    def remove(self, version: int, keys: List[Key]) -> None:
+        self._run(version, [(interface_key({'device': device, 'name': name}), version, '') for device, name in keys])
+
+    def load(self, version: int, interfaces: List[Dict], deleted: int = 0) -> bool:
+        with self.client.pipeline(transaction=True) as pipe:
+            try:
+                # Another process applying a newer change meanwhile aborts the load
+                pipe.watch(self.version_key)
+                if int(pipe.get(self.version_key) or 0) >= version and pipe.exists(self.interfaces_key):
+                    return False
+                pipe.multi()
+                pipe.delete(self.interfaces_key, self.versions_key)
+                if interfaces:
+                    pipe.hset(self.interfaces_key, mapping={
+                        interface_key(interface): json.dumps(interface) for interface in interfaces
+                    })
+                pipe.set(self.version_key, version)
+                pipe.set(self.loaded_key, version)
+                pipe.set(self.deleted_key, deleted)
+                pipe.execute()
+                return True
+            except self.redis_module.WatchError:
+                return False
+
+
+def warm(store: StateStore) -> None:
+    """Fill the store from the database when it is behind, e.g. on first start or after a Redis flush"""
+    from .ingest import current_state_versions
+
+    version, deleted = current_state_versions()
+    if store.version() >= version:
+        return
+    interfaces = [serialize_interface(interface) for interface in NetworkInterface.objects.all()]
+    if store.load(version, interfaces, deleted):
+        print(f"[STATE] Loaded {len(interfaces)} interfaces at version {version}")
+
+
+_store = None
+_store_backend = None
+_store_lock = threading.Lock()
+
+
+def get_state_store() -> StateStore:
+    """Return the process-wide state store, or None when STATE_STORE is 'database'"""
+    global _store, _store_backend
+
+    backend = settings.STATE_STORE
+    if backend == 'database':
+        return None
+
+    if _store is None or _store_backend != backend:
+        with _store_lock:
+            if _store is None or _store_backend != backend:
+                if backend == 'locmem':
+                    store = LocMemStateStore()
+                elif backend == 'redis':
+                    store = RedisStateStore(settings.STATE_STORE_URL, settings.STATE_STORE_PREFIX)
+                else:
+                    raise ValueError(f'Unknown STATE_STORE {backend!r}, use database, locmem or redis')
+                warm(store)
+                _store, _store_backend = store, backend
+                return store
+
+    store = _store
+    if backend == 'locmem':
+        # Only this process's changes reach a locmem store directly; catch up with any other
+        # process (run_syslog, a separate run_collector) from the database's state version
+        warm(store)
+    return store
+
+
+def update_store(update: Callable[[StateStore], None]) -> None:
+    """Run update on the state store, if one is configured; never fails the caller"""
+    global _store
+
+    try:
+        store = get_state_store()
+        if store is not None:
+            update(store)
+    except Exception as e:
+        print(f"[STATE] Could not update the state store: {e}")
+        # The database has the change; reload the store from it on next use
+        with _store_lock:
+            _store = None
+
+
+def store_changes(version: int, interfaces: Iterable[NetworkInterface]) -> None:
+    """Apply committed interface changes to the state store, if one is configured"""
+    update_store(lambda store: store.apply(version, [serialize_interface(interface) for interface in interfaces]))
+
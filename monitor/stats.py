@@ -0,0 +1,112 @@
+from typing import Callable, Dict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .metrics import record_cache
+from .models import NetworkInterface, NetworkLog
+from .state_store import get_state_store
+
+COUNTERS_KEY = 'monitor:stats:counters'
+CHART_KEY = 'monitor:stats:chart:{}'
+
+
+def interface_counts() -> Dict:
+    # One conditional aggregate over interfaces instead of three COUNT queries
+    return {
+        'total_interfaces': Count('id'),
+        'interfaces_up': Count('id', filter=Q(status='up')),
+        'interfaces_down': Count('id', filter=Q(status='down')),
+    }
+
+
+def unresolved_errors():
+    return NetworkLog.objects.filter(log_type='error', resolved=False)
+
+
+def with_uptime(counters: Dict) -> Dict:
+    total = counters['total_interfaces']
+    uptime = (counters['interfaces_up'] / total * 100) if total > 0 else 100
+    counters['uptime_percentage'] = round(uptime, 2)
+    return counters
+
+
+def stored_interface_counts(store) -> Dict:
+    """The interface_counts() aggregate, taken from the state store's snapshot"""
+    _, interfaces, _ = store.snapshot()
+    up = sum(1 for interface in interfaces if interface['status'] == 'up')
+    down = sum(1 for interface in interfaces if interface['status'] == 'down')
+    return {'total_interfaces': len(interfaces), 'interfaces_up': up, 'interfaces_down': down}
+
+
+def compute_counters() -> Dict:
+    """Interface and unresolved-error counters, interfaces from the state store when there is one"""
+    store = get_state_store()
+    if store is not None:
+        counters = stored_interface_counts(store)
+    else:
+        counters = NetworkInterface.objects.aggregate(**interface_counts())
+    counters['total_errors'] = unresolved_errors().count()
+    return with_uptime(counters)
+
+
+async def acompute_counters() -> Dict:
+    """compute_counters() through the async ORM"""
+    store = await sync_to_async(get_state_store)()
+    if store is not None:
+        counters = await sync_to_async(stored_interface_counts)(store)
+    else:
+        counters = await NetworkInterface.objects.aaggregate(**interface_counts())
+    counters['total_errors'] = await unresolved_errors().acount()
+    return with_uptime(counters)
+
+
+def get_counters() -> Dict:
+    """Current counters, served from the cache until they change or STATS_CACHE_TTL expires"""
+    counters = cache.get(COUNTERS_KEY)
+    record_cache('stats_counters', counters is not None)
+    if counters is None:
+        counters = compute_counters()
+        cache.set(COUNTERS_KEY, counters, settings.STATS_CACHE_TTL)
+    return counters
+
+
+async def aget_counters() -> Dict:
+    """get_counters() for async views"""
+    counters = await cache.aget(COUNTERS_KEY)
+    record_cache('stats_counters', counters is not None)
+    if counters is None:
+        counters = await acompute_counters()
+        await cache.aset(COUNTERS_KEY, counters, settings.STATS_CACHE_TTL)
+    return counters
+
+
+def invalidate_counters() -> None:
+    """Drop cached counters after interfaces or logs change"""
+    cache.delete(COUNTERS_KEY)
+
+
+def get_chart(key: str, build: Callable[[], Dict]) -> Dict:
+    """Chart data for one requested range, cached for STATS_CACHE_TTL.
+
+    Chart points only change when the collector takes a sample, so
+    these entries simply expire rather than being invalidated.
+    """
+    chart = cache.get(CHART_KEY.format(key))
+    record_cache('stats_chart', chart is not None)
+    if chart is None:
+        chart = build()
+        cache.set(CHART_KEY.format(key), chart, settings.STATS_CACHE_TTL)
+    return chart
+
+
+async def aget_chart(key: str, build: Callable[[], Dict]) -> Dict:
+    """get_chart() for async views; build still runs synchronously, in a worker thread"""
+    chart = await cache.aget(CHART_KEY.format(key))
+    record_cache('stats_chart', chart is not None)
+    if chart is None:
+        chart = await sync_to_async(build)()
+        await cache.aset(CHART_KEY.format(key), chart, settings.STATS_CACHE_TTL)
+    return chart
@@ -0,0 +1,207 @@
+import asyncio
+import re
+import socket
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .ingest import ingest_interfaces
+from .models import Device
+
+# %LINK-3-UPDOWN, %LINK-5-CHANGED and %LINEPROTO-5-UPDOWN as logged by IOS
+LINK_EVENT_RE = re.compile(
+    r'%(?P<facility>LINK|LINEPROTO)-\d-(?:UPDOWN|CHANGED): '
+    r'(?:Line protocol on )?Interface (?P<name>[^,]+), '
+    r'changed state to (?P<state>administratively down|up|down)'
+)
+
+
+def parse_link_event(message: str) -> Optional[Tuple[str, str]]:
+    """Return (interface name, status) for a link up/down syslog message, else None.
+
+    The dashboard status follows the line state, as in ``show ip interface
+    brief``: LINK messages set it, and LINEPROTO only ever raises it (the
+    protocol cannot be up on a down line; a protocol-only failure leaves
+    the line up).
+    """
+    match = LINK_EVENT_RE.search(message)
+    if match is None:
+        return None
+
+    status = 'up' if match.group('state') == 'up' else 'down'
+    if match.group('facility') == 'LINEPROTO' and status == 'down':
+        return None
+    return match.group('name').strip(), status
+
+
+class DeviceResolver:
+    """Maps syslog source addresses to inventory device names, refreshed periodically"""
+
+    def __init__(self, refresh_interval: float = 60):
+        self.refresh_interval = refresh_interval
+        self.hosts: Dict[str, str] = {}
+        self.inventory = False
+
+    def refresh(self):
+        close_old_connections()
+        devices = list(Device.objects.filter(enabled=True).values_list('host', 'name'))
+        self.hosts = dict(devices)
+        self.inventory = bool(devices)
+
+    def resolve(self, address: str) -> Optional[str]:
+        """Device name for a source address; '' for the single configured device when there is no inventory"""
+        if address in self.hosts:
+            return self.hosts[address]
+        return None if self.inventory else ''
+
+
+class SyslogBatcher:
+    """Collects link events and writes them through the ingest path in batches.
+
+    Each interface keeps its transitions in arrival order, minus repeats of
+    the state before, and they are replayed oldest first so flap dampening
+    and outage tracking see every one. A batch costs one ingest per device
+    for every transition the busiest interface went through, instead of one
+    per message. Each flush runs in a worker thread, one at a time, while
+    the event loop keeps receiving; a failed flush puts what was not
+    written back in front of the newer events.
+    """
+
+    def __init__(self, flush_interval: float = None, batch_size: int = None, ingest=ingest_interfaces):
+        self.flush_interval = flush_interval if flush_interval is not None else settings.SYSLOG_FLUSH_INTERVAL
+        self.batch_size = batch_size or settings.SYSLOG_BATCH_SIZE
+        self.ingest = ingest
+        self.pending: Dict[Tuple[str, str], List[str]] = {}
+        self.received = 0
+        self.flushes = 0
+        self._wakeup = asyncio.Event()
+
+    def add(self, device: str, interface_name: str, status: str):
+        statuses = self.pending.setdefault((device, interface_name), [])
+        if not statuses or statuses[-1] != status:
+            statuses.append(status)
+        self.received += 1
+        if len(self.pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def take(self) -> Dict[Tuple[str, str], List[str]]:
+        """Remove the pending transitions"""
+        batch = self.pending
+        self.pending = {}
+        self._wakeup.clear()
+        return batch
+
+    def requeue(self, batch: Dict[Tuple[str, str], List[str]]):
+        """Put unwritten transitions back ahead of any that arrived since"""
+        pending = batch
+        for key, statuses in self.pending.items():
+            queued = pending.setdefault(key, [])
+            for status in statuses:
+                if not queued or queued[-1] != status:
+                    queued.append(status)
+        self.pending = pending
+
+    def write(self, batch: Dict[Tuple[str, str], List[str]]):
+        """Ingest a batch in rounds of each interface's oldest transition; written ones leave the batch"""
+        close_old_connections()
+        try:
+            while batch:
+                rounds: Dict[str, List[Dict]] = {}
+                for (device, interface_name), statuses in batch.items():
+                    rounds.setdefault(device, []).append({'name': interface_name, 'status': statuses[0]})
+                for device, records in rounds.items():
+                    self.ingest(records, device=device)
+                    for record in records:
+                        key = (device, record['name'])
+                        del batch[key][0]
+                        if not batch[key]:
+                            del batch[key]
+        finally:
+            close_old_connections()
+
+    async def flush(self):
+        if self.pending:
+            self.flushes += 1
+            batch = self.take()
+            try:
+                await asyncio.to_thread(self.write, batch)
+            except Exception:
+                self.requeue(batch)
+                raise
+
+    async def run(self, stop: asyncio.Event):
+        """Flush every flush_interval, or as soon as batch_size interfaces are waiting"""
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[SYSLOG] Could not store events, retrying: {e}")
+        await self.flush()
+
+
+class SyslogProtocol(asyncio.DatagramProtocol):
+    """Receives syslog datagrams and queues link up/down events"""
+
+    def __init__(self, batcher: SyslogBatcher, resolver: DeviceResolver):
+        self.batcher = batcher
+        self.resolver = resolver
+        self.ignored = 0
+
+    def datagram_received(self, data, addr):
+        event = parse_link_event(data.decode('utf-8', errors='replace'))
+        if event is None:
+            return
+
+        device = self.resolver.resolve(addr[0])
+        if device is None:
+            self.ignored += 1
+            return
+        self.batcher.add(device, *event)
+
+
+async def serve_syslog(host: str = None, port: int = None, stop: asyncio.Event = None,
+                       batcher: SyslogBatcher = None, resolver: DeviceResolver = None,
+                       ready: asyncio.Future = None) -> SyslogBatcher:
+    """Listen for syslog on UDP until stop is set; return the batcher for its counters.
+
+    ``ready``, if given, receives the bound (host, port) once listening.
+    """
+    host = host or settings.SYSLOG_HOST
+    port = port if port is not None else settings.SYSLOG_PORT
+    stop = stop or asyncio.Event()
+    batcher = batcher or SyslogBatcher()
+    resolver = resolver or DeviceResolver()
+
+    await asyncio.to_thread(resolver.refresh)
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: SyslogProtocol(batcher, resolver),
+        local_addr=(host, port),
+    )
+    try:
+        # A larger receive buffer absorbs bursts while a batch is being written
+        transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, settings.SYSLOG_RECEIVE_BUFFER)
+    except OSError as e:
+        print(f"[SYSLOG] Could not enlarge the receive buffer: {e}")
+    address = transport.get_extra_info('sockname')[:2]
+    print(f"[SYSLOG] Listening on {address[0]}:{address[1]}/udp")
+    if ready is not None:
+        ready.set_result(address)
+
+    flusher = asyncio.create_task(batcher.run(stop))
+    try:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), resolver.refresh_interval)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(resolver.refresh)
+    finally:
+        transport.close()
+        stop.set()
+        await flusher
+    return batcher
@@ -0,0 +1,265 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db.models import Avg, Count, F, Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMinute
+from django.utils import timezone
+
+from .archive import archive_table
+from .counters import Rates
+from .models import InterfaceRate, NetworkStats, NetworkStatsRollup
+from .stats import compute_counters
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Rollup tiers, finest first: (resolution, bucket size, truncation function, source tier)
+TIERS = [
+    ('1m', timedelta(minutes=1), TruncMinute, 'raw'),
+    ('1h', timedelta(hours=1), TruncHour, '1m'),
+    ('1d', timedelta(days=1), TruncDay, '1h'),
+]
+
+ROLLUP_FIELDS = [
+    'samples', 'uptime_min', 'uptime_max', 'uptime_avg',
+    'interfaces_up_min', 'interfaces_up_max', 'interfaces_up_avg',
+    'interfaces_down_min', 'interfaces_down_max', 'interfaces_down_avg',
+    'total_errors_max',
+]
+
+# Upper bound on points returned for one chart
+MAX_POINTS = 720
+
+
+def bucket_floor(moment: datetime, step: timedelta) -> datetime:
+    """Start of the UTC bucket of size step that contains moment"""
+    return EPOCH + ((moment - EPOCH) // step) * step
+
+
+def retention(tier: str) -> timedelta:
+    return timedelta(days=settings.STATS_RETENTION_DAYS[tier])
+
+
+def record_sample() -> NetworkStats:
+    """Store one raw stats sample from the current interface snapshot"""
+    counters = compute_counters()
+    return NetworkStats.objects.create(
+        total_interfaces=counters['total_interfaces'],
+        interfaces_up=counters['interfaces_up'],
+        interfaces_down=counters['interfaces_down'],
+        total_errors=counters['total_errors'],
+        uptime_percentage=counters['uptime_percentage'],
+    )
+
+
+def record_rates(rates: Rates, now: datetime = None) -> int:
+    """Store one sweep of interface rates; return rows written"""
+    now = now or timezone.now()
+    rows = [InterfaceRate(timestamp=now, **row) for row in rates.rows()]
+    InterfaceRate.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _raw_buckets(trunc, start, end):
+    rows = NetworkStats.objects.filter(timestamp__lt=end)
+    if start is not None:
+        rows = rows.filter(timestamp__gte=start)
+
+    for row in rows.order_by().values(bucket=trunc('timestamp', tzinfo=dt_timezone.utc)).annotate(
+        samples=Count('id'),
+        uptime_min=Min('uptime_percentage'),
+        uptime_max=Max('uptime_percentage'),
+        uptime_avg=Avg('uptime_percentage'),
+        interfaces_up_min=Min('interfaces_up'),
+        interfaces_up_max=Max('interfaces_up'),
+        interfaces_up_avg=Avg('interfaces_up'),
+        interfaces_down_min=Min('interfaces_down'),
+        interfaces_down_max=Max('interfaces_down'),
+        interfaces_down_avg=Avg('interfaces_down'),
+        total_errors_max=Max('total_errors'),
+    ):
+        yield row
+
+
+def _rollup_buckets(source, trunc, start, end):
+    rows = NetworkStatsRollup.objects.filter(resolution=source, bucket_start__lt=end)
+    if start is not None:
+        rows = rows.filter(bucket_start__gte=start)
+
+    # Averages of averages are weighted by the number of raw samples behind each bucket
+    for row in rows.order_by().values(bucket=trunc('bucket_start', tzinfo=dt_timezone.utc)).annotate(
+        total_samples=Sum('samples'),
+        uptime_min=Min('uptime_min'),
+        uptime_max=Max('uptime_max'),
+        uptime_sum=Sum(F('uptime_avg') * F('samples')),
+        interfaces_up_min=Min('interfaces_up_min'),
+        interfaces_up_max=Max('interfaces_up_max'),
+        interfaces_up_sum=Sum(F('interfaces_up_avg') * F('samples')),
+        interfaces_down_min=Min('interfaces_down_min'),
+        interfaces_down_max=Max('interfaces_down_max'),
+        interfaces_down_sum=Sum(F('interfaces_down_avg') * F('samples')),
+        total_errors_max=Max('total_errors_max'),
+    ):
+        samples = row.pop('total_samples') or 0
+        row['samples'] = samples
+        for field in ('uptime', 'interfaces_up', 'interfaces_down'):
+            total = row.pop(f'{field}_sum') or 0
+            row[f'{field}_avg'] = total / samples if samples else 0
+        yield row
+
+
+def rollup(resolution: str, now: datetime = None) -> int:
+    """Aggregate completed buckets for one tier from the tier below it; return buckets written"""
+    now = now or timezone.now()
+    _, step, trunc, source = next(tier for tier in TIERS if tier[0] == resolution)
+    end = bucket_floor(now, step)
+
+    last = NetworkStatsRollup.objects.filter(resolution=resolution).aggregate(last=Max('bucket_start'))['last']
+    start = last + step if last else None
+    if start is not None and start >= end:
+        return 0
+
+    if source == 'raw':
+        rows = _raw_buckets(trunc, start, end)
+    else:
+        rows = _rollup_buckets(source, trunc, start, end)
+
+    buckets = [
+        NetworkStatsRollup(
+            resolution=resolution,
+            bucket_start=row['bucket'],
+            **{field: row[field] for field in ROLLUP_FIELDS},
+        )
+        for row in rows
+    ]
+    if buckets:
+        NetworkStatsRollup.objects.bulk_create(
+            buckets,
+            update_conflicts=True,
+            unique_fields=['resolution', 'bucket_start'],
+            update_fields=ROLLUP_FIELDS,
+        )
+    return len(buckets)
+
+
+def rollup_all(now: datetime = None) -> Dict[str, int]:
+    """Roll up every tier, finest first so coarser tiers see fresh data"""
+    now = now or timezone.now()
+    return {resolution: rollup(resolution, now) for resolution, _, _, _ in TIERS}
+
+
+def prune(now: datetime = None) -> Dict[str, int]:
+    """Delete raw samples, interface rates and rollups older than their tier's retention.
+
+    With ARCHIVE_PRUNED, raw samples and rates are moved to the archive instead.
+    """
+    now = now or timezone.now()
+    deleted = {}
+
+    if settings.ARCHIVE_PRUNED:
+        # Rollups have already been taken from these rows; keep the originals on disk
+        deleted['raw'] = archive_table('stats', now - retention('raw'))['rows']
+        deleted['rates'] = archive_table('rates', now - retention('rates'))['rows']
+    else:
+        deleted['raw'], _ = NetworkStats.objects.filter(timestamp__lt=now - retention('raw')).delete()
+        deleted['rates'], _ = InterfaceRate.objects.filter(timestamp__lt=now - retention('rates')).delete()
+    for resolution, _, _, _ in TIERS:
+        deleted[resolution], _ = NetworkStatsRollup.objects.filter(
+            resolution=resolution,
+            bucket_start__lt=now - retention(resolution),
+        ).delete()
+    return deleted
+
+
+def pick_tier(start: datetime, end: datetime, now: datetime = None) -> Tuple[str, timedelta]:
+    """Finest tier that still covers start and returns at most MAX_POINTS points"""
+    now = now or timezone.now()
+    candidates = [('raw', timedelta(seconds=settings.STATS_SAMPLE_INTERVAL))]
+    candidates += [(resolution, step) for resolution, step, _, _ in TIERS]
+
+    for resolution, step in candidates:
+        if start >= now - retention(resolution) and (end - start) / step <= MAX_POINTS:
+            return resolution, step
+    return candidates[-1]
+
+
+def query_series(start: datetime, end: datetime, now: datetime = None) -> Dict:
+    """Chart points between start and end from the most suitable tier"""
+    resolution, step = pick_tier(start, end, now)
+
+    if resolution == 'raw':
+        points: List[Tuple] = list(
+            NetworkStats.objects.filter(timestamp__gte=start, timestamp__lt=end)
+            .order_by('timestamp')
+            .values_list('timestamp', 'uptime_percentage', 'interfaces_up', 'interfaces_down')
+        )
+    else:
+        points = list(
+            NetworkStatsRollup.objects.filter(
+                resolution=resolution,
+                bucket_start__gte=bucket_floor(start, step),
+                bucket_start__lt=end,
+            )
+            .order_by('bucket_start')
+            .values_list('bucket_start', 'uptime_avg', 'interfaces_up_avg', 'interfaces_down_avg')
+        )
+
+    label_format = {'raw': '%H:%M:%S', '1m': '%H:%M', '1h': '%m-%d %H:%M', '1d': '%Y-%m-%d'}[resolution]
+    return {
+        'resolution': resolution,
+        'labels': [timestamp.strftime(label_format) for timestamp, _, _, _ in points],
+        'uptime': [round(uptime, 2) for _, uptime, _, _ in points],
+        'interfaces_up': [round(up, 2) for _, _, up, _ in points],
+        'interfaces_down': [round(down, 2) for _, _, _, down in points],
+    }
+
+
+RATE_FIELDS = ['in_bps', 'out_bps', 'in_pps', 'out_pps', 'errors_per_sec', 'drops_per_sec',
+               'in_utilization', 'out_utilization']
+
+
+def query_rates(device: str, interface_name: str, start: datetime, end: datetime) -> Dict:
+    """Rate series of one interface, averaged in SQL into buckets when the range holds over MAX_POINTS sweeps"""
+    rows = InterfaceRate.objects.filter(
+        device=device,
+        interface_name=interface_name,
+        timestamp__gte=start,
+        timestamp__lt=end,
+    )
+
+    if (end - start) / timedelta(seconds=settings.COLLECTOR_INTERVAL) <= MAX_POINTS:
+        resolution = 'raw'
+        points = list(rows.order_by('timestamp').values_list('timestamp', *RATE_FIELDS))
+    else:
+        # Finest bucket size that keeps the range within MAX_POINTS, whole days past that
+        resolution, _, trunc, _ = next(
+            (tier for tier in TIERS if (end - start) / tier[1] <= MAX_POINTS), TIERS[-1],
+        )
+        points = list(
+            rows.order_by()
+            .values(bucket=trunc('timestamp', tzinfo=dt_timezone.utc))
+            .annotate(**{field: Avg(field) for field in RATE_FIELDS})
+            .order_by('bucket')
+            .values_list('bucket', *RATE_FIELDS)
+        )
+
+    series = {'resolution': resolution, 'labels': [point[0].isoformat() for point in points]}
+    for index, field in enumerate(RATE_FIELDS, start=1):
+        series[field] = [round(point[index], 2) for point in points]
+    return series
+
+
+def latest_rates(device: str = None) -> List[Dict]:
+    """Rates from the most recent sweep, busiest interfaces first"""
+    rates = InterfaceRate.objects.all()
+    if device is not None:
+        rates = rates.filter(device=device)
+
+    last = rates.aggregate(last=Max('timestamp'))['last']
+    if last is None:
+        return []
+    return list(
+        rates.filter(timestamp=last)
+        .order_by('-in_utilization', 'device', 'interface_name')
+        .values('device', 'interface_name', *RATE_FIELDS)
+    )
@@ -7,7 +7,14 @@ urlpatterns = [
     path('logout/', views.custom_logout, name='logout'),
     path('api/interfaces/', views.get_interfaces, name='get_interfaces'),
     path('api/fix-interface/', views.fix_interface, name='fix_interface'),
+    path('api/jobs/<int:job_id>/', views.get_job, name='get_job'),
     path('api/logs/', views.get_logs, name='get_logs'),
+    path('api/logs/export/', views.export_logs, name='export_logs'),
     path('api/stats/', views.get_stats, name='get_stats'),
+    path('api/rates/', views.get_rates, name='get_rates'),
+    path('api/availability/', views.get_availability, name='get_availability'),
+    path('api/archive/stats/', views.get_archived_stats, name='get_archived_stats'),
+    path('api/archive/logs/', views.get_archived_logs, name='get_archived_logs'),
     path('api/clear-logs/', views.clear_logs, name='clear_logs'),
+    path('metrics', views.metrics, name='metrics'),
 ]
@@ -2,14 +2,34 @@ import os
 import json
 import random
 from datetime import datetime, timedelta
+from functools import wraps
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.db import transaction
+from django.conf import settings
+from django.http import (
+    HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified, JsonResponse, StreamingHttpResponse,
+)
+from django.utils.crypto import constant_time_compare
 from django.views.decorators.http import require_http_methods
 from django.contrib import messages
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from dotenv import load_dotenv
-from .models import NetworkInterface, NetworkLog, NetworkStats
-from .cisco_handler import CiscoDeviceHandler, SimulationHandler
+from .models import NetworkInterface, NetworkLog, NetworkStats, RemediationJob
+from .archive import archived_series, read_archive
+from .availability import availability_report
+from .collector import ensure_embedded_collector, get_named_handler
+from .events import publish
+from .ingest import acurrent_state_versions
+from .log_filters import EXPORT_FORMATS, aexport_logs, apaginate_logs, filter_logs, parse_limit
+from .metrics import CONTENT_TYPE, REGISTRY
+from .remediation import enqueue_fix, get_remediation_queue
+from .serializers import serialize_interface, serialize_job, serialize_log
+from .state_store import get_state_store
+from .stats import aget_chart, aget_counters, invalidate_counters
+from .timeseries import MAX_POINTS, latest_rates, query_rates, query_series
 
 load_dotenv()
 
@@ -50,6 +70,23 @@ def is_authenticated(request):
     return request.session.get('authenticated', False)
 
 
+async def ais_authenticated(request):
+    """is_authenticated() for async views; loading the session is a blocking database read"""
+    return await sync_to_async(is_authenticated)(request)
+
+
+def async_require_http_methods(request_method_list):
+    """require_http_methods() for async views; Django 4.2's decorator only wraps sync ones"""
+    def decorator(func):
+        @wraps(func)
+        async def inner(request, *args, **kwargs):
+            if request.method not in request_method_list:
+                return HttpResponseNotAllowed(request_method_list)
+            return await func(request, *args, **kwargs)
+        return inner
+    return decorator
+
+
 @require_http_methods(["GET"])
 def dashboard(request):
     """Main dashboard view"""
@@ -57,6 +94,7 @@ def dashboard(request):
         return redirect('login')
     
     mode = os.getenv('MODE', 'simulation')
+    ensure_embedded_collector()
     
     # Get or create initial stats
     stats = NetworkStats.objects.first()
@@ -81,71 +119,59 @@ def dashboard(request):
     return render(request, 'monitor/dashboard.html', context)
 
 
-@require_http_methods(["GET"])
-def get_interfaces(request):
-    """API endpoint to get network interfaces"""
-    if not is_authenticated(request):
+@async_require_http_methods(["GET"])
+async def get_interfaces(request):
+    """API endpoint to get network interfaces, or with ?since=<version> only those changed since"""
+    if not await ais_authenticated(request):
         return JsonResponse({'error': 'Unauthorized'}, status=401)
     
-    mode = os.getenv('MODE', 'simulation')
+    ensure_embedded_collector()
     
-    if mode == 'device':
-        handler = CiscoDeviceHandler()
+    since = request.GET.get('since', '')
+    if since and not since.isdigit():
+        return JsonResponse({'error': 'since must be a state version'}, status=400)
+    since = int(since) if since else None
+    
+    # Read the version before the rows: a change racing this request is
+    # then sent again on the next delta rather than skipped
+    store = await sync_to_async(get_state_store)()
+    if store is not None:
+        version = await sync_to_async(store.version)()
     else:
-        handler = SimulationHandler()
+        version, deleted = await acurrent_state_versions()
+    etag = f'"{version}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
     
-    interfaces = handler.get_interfaces()
+    # Serve the snapshot written by the collector; never touch the device here
+    if store is not None:
+        # The store reads version and rows together, so no database query at all
+        version, interfaces_data, full = await sync_to_async(store.snapshot)(since)
+        etag = f'"{version}"'
+    else:
+        interfaces = NetworkInterface.objects.all()
+        full = True
+        # A client ahead of the server (e.g. after a database reset) gets a full snapshot, and so
+        # does one that has not seen a deletion: rows that are gone cannot be sent as a delta
+        if since is not None and deleted <= since <= version:
+            interfaces = interfaces.filter(version__gt=since)
+            full = False
+        interfaces_data = [serialize_interface(interface) async for interface in interfaces]
     
-    # Update or create interface records (with error handling for locked database)
-    for interface_data in interfaces:
-        try:
-            existing = NetworkInterface.objects.filter(interface_name=interface_data['name']).first()
-            
-            if existing:
-                # Check if status changed
-                old_status = existing.status
-                new_status = interface_data['status']
-                
-                # Update the interface
-                existing.interface_type = interface_data['type']
-                existing.ip_address = interface_data.get('ip_address')
-                existing.status = new_status
-                existing.save()
-                
-                # Log status changes
-                if old_status != new_status:
-                    if new_status == 'down':
-                        NetworkLog.objects.create(
-                            interface_name=interface_data['name'],
-                            log_type='error',
-                            message=f'Interface went DOWN',
-                            resolved=False
-                        )
-                    else:
-                        NetworkLog.objects.create(
-                            interface_name=interface_data['name'],
-                            log_type='success',
-                            message=f'Interface came back UP (auto-recovery)',
-                            resolved=True
-                        )
-            else:
-                # Create new interface
-                NetworkInterface.objects.create(
-                    interface_name=interface_data['name'],
-                    interface_type=interface_data['type'],
-                    ip_address=interface_data.get('ip_address'),
-                    status=interface_data['status']
-                )
-        except Exception as e:
-            print(f"Error updating interface {interface_data['name']}: {e}")
-            continue
-    
-    return JsonResponse({'interfaces': interfaces})
+    response = JsonResponse({
+        'version': version,
+        'full': full,
+        'interfaces': interfaces_data,
+    })
+    response['ETag'] = etag
+    return response
 
 
 @require_http_methods(["POST"])
 def fix_interface(request):
-    """API endpoint to fix a down interface"""
+    """API endpoint to queue a fix of a down interface; answers 202 with the job to follow"""
     if not is_authenticated(request):
         return JsonResponse({'error': 'Unauthorized'}, status=401)
     
@@ -155,98 +181,221 @@ def fix_interface(request):
     if not interface_name:
         return JsonResponse({'success': False, 'message': 'Interface name required'})
     
-    mode = os.getenv('MODE', 'simulation')
+    device_name = data.get('device', '')
+    if get_named_handler(device_name) is None:
+        return JsonResponse({'success': False, 'message': f'Unknown device {device_name}'})
+    
+    if get_remediation_queue().full():
+        return JsonResponse({'success': False, 'message': 'Too many fixes in progress, try again shortly'}, status=503)
+    
+    # The SSH work runs on the remediation workers, not in this request
+    job, created = enqueue_fix(device_name, interface_name, request.session.get('username', ''))
+    message = f'Fix of {interface_name} queued' if created else f'A fix of {interface_name} is already {job.status}'
+    
+    return JsonResponse({
+        'success': True,
+        'queued': created,
+        'message': message,
+        'job': serialize_job(job),
+    }, status=202)
+
+
+@async_require_http_methods(["GET"])
+async def get_job(request, job_id):
+    """API endpoint to follow a remediation job"""
+    if not await ais_authenticated(request):
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+    
+    job = await RemediationJob.objects.filter(pk=job_id).afirst()
+    if job is None:
+        return JsonResponse({'error': 'Unknown job'}, status=404)
     
-    if mode == 'device':
-        handler = CiscoDeviceHandler()
+    return JsonResponse({'job': serialize_job(job)})
+
+
+@async_require_http_methods(["GET"])
+async def get_logs(request):
+    """API endpoint to get network logs, newest first, one keyset page at a time"""
+    if not await ais_authenticated(request):
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+    
+    try:
+        limit = parse_limit(request.GET.get('limit'))
+        logs, next_cursor = await apaginate_logs(filter_logs(request.GET), limit, request.GET.get('cursor'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    logs_data = [serialize_log(log) for log in logs]
+    
+    return JsonResponse({'logs': logs_data, 'next_cursor': next_cursor})
+
+
+@async_require_http_methods(["GET"])
+async def export_logs(request):
+    """API endpoint to download every log matching the /api/logs/ filters as NDJSON or CSV, oldest first"""
+    if not await ais_authenticated(request):
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+    
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'format must be one of {", ".join(EXPORT_FORMATS)}'}, status=400)
+    try:
+        logs = filter_logs(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    # An async iterator streams under ASGI; a sync one would be read into memory first
+    response = StreamingHttpResponse(aexport_logs(logs, export_format), content_type=EXPORT_FORMATS[export_format])
+    filename = f"logs-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+RANGE_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
+def parse_time_range(request, default: timedelta):
+    """Read ?range=30m|6h|7d or ?start=&end= (ISO 8601) into a (start, end) pair"""
+    end = timezone.now()
+    if request.GET.get('end'):
+        end = parse_datetime(request.GET['end'])
+        if end is None:
+            raise ValueError('Invalid end time')
+    
+    if request.GET.get('start'):
+        start = parse_datetime(request.GET['start'])
+        if start is None:
+            raise ValueError('Invalid start time')
+    elif request.GET.get('range'):
+        value, unit = request.GET['range'][:-1], request.GET['range'][-1:]
+        if unit not in RANGE_UNITS or not value.isdigit():
+            raise ValueError('Invalid range, use e.g. 30m, 6h or 7d')
+        try:
+            start = end - timedelta(**{RANGE_UNITS[unit]: int(value)})
+        except OverflowError:
+            # Further back than datetime can go
+            raise ValueError('Invalid range')
     else:
-        handler = SimulationHandler()
+        start = end - default
     
-    result = handler.fix_interface(interface_name)
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start)
+    if timezone.is_naive(end):
+        end = timezone.make_aware(end)
+    if start >= end:
+        raise ValueError('start must be before end')
+    return start, end
+
+
+@async_require_http_methods(["GET"])
+async def get_stats(request):
+    """API endpoint to get network statistics"""
+    if not await ais_authenticated(request):
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
     
-    # Log the action
-    if result['success']:
-        NetworkLog.objects.create(
-            interface_name=interface_name,
-            log_type='success',
-            message=result['message'],
-            resolved=True
-        )
+    try:
+        start, end = parse_time_range(request, default=timedelta(hours=1))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    # Ranges relative to now share one cache entry; any fixed bound keys the entry by both bounds
+    if request.GET.get('start') or request.GET.get('end'):
+        chart_key = f"{start.isoformat()}/{end.isoformat()}"
     else:
-        NetworkLog.objects.create(
-            interface_name=interface_name,
-            log_type='error',
-            message=result['message'],
-            resolved=False
-        )
+        chart_key = request.GET.get('range', 'default')
     
-    return JsonResponse(result)
+    # Samples are taken by the collector; reading stats never writes
+    stats_data = dict(await aget_counters())
+    stats_data['chart_data'] = await aget_chart(chart_key, lambda: query_series(start, end))
+    
+    return JsonResponse(stats_data)
 
 
-@require_http_methods(["GET"])
-def get_logs(request):
-    """API endpoint to get network logs"""
-    if not is_authenticated(request):
+@async_require_http_methods(["GET"])
+async def get_rates(request):
+    """API endpoint to get interface traffic and error rates.
+    
+    With ?interface= (and ?device=) returns that interface's series over
+    the requested range; otherwise the latest rates of every interface.
+    """
+    if not await ais_authenticated(request):
         return JsonResponse({'error': 'Unauthorized'}, status=401)
     
-    limit = int(request.GET.get('limit', 50))
-    logs = NetworkLog.objects.all()[:limit]
+    device = request.GET.get('device')
+    interface_name = request.GET.get('interface')
+    if not interface_name:
+        return JsonResponse({'rates': await sync_to_async(latest_rates)(device)})
     
-    logs_data = [{
-        'id': log.id,
-        'interface_name': log.interface_name,
-        'log_type': log.log_type,
-        'message': log.message,
-        'timestamp': log.timestamp.isoformat(),
-        'resolved': log.resolved,
-    } for log in logs]
+    try:
+        start, end = parse_time_range(request, default=timedelta(hours=1))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     
-    return JsonResponse({'logs': logs_data})
+    return JsonResponse(await sync_to_async(query_rates)(device or '', interface_name, start, end))
 
 
-@require_http_methods(["GET"])
-def get_stats(request):
-    """API endpoint to get network statistics"""
-    if not is_authenticated(request):
+@async_require_http_methods(["GET"])
+async def get_availability(request):
+    """API endpoint to get availability, MTTR, MTBF and outage counts per interface over a time range.
+    
+    Defaults to the last 30 days; ?device= and ?interface= narrow the report.
+    """
+    if not await ais_authenticated(request):
         return JsonResponse({'error': 'Unauthorized'}, status=401)
     
-    # Calculate current stats
-    total_interfaces = NetworkInterface.objects.count()
-    interfaces_up = NetworkInterface.objects.filter(status='up').count()
-    interfaces_down = NetworkInterface.objects.filter(status='down').count()
-    total_errors = NetworkLog.objects.filter(log_type='error', resolved=False).count()
-    
-    uptime_percentage = (interfaces_up / total_interfaces * 100) if total_interfaces > 0 else 100
-    
-    # Update stats
-    NetworkStats.objects.create(
-        total_interfaces=total_interfaces,
-        interfaces_up=interfaces_up,
-        interfaces_down=interfaces_down,
-        total_errors=total_errors,
-        uptime_percentage=uptime_percentage
+    try:
+        start, end = parse_time_range(request, default=timedelta(days=30))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    report = await sync_to_async(availability_report)(
+        start, end, device=request.GET.get('device') or None, interface_name=request.GET.get('interface') or None,
     )
+    return JsonResponse(report)
+
+
+@async_require_http_methods(["GET"])
+async def get_archived_stats(request):
+    """API endpoint to chart archived stats samples over ?range= or ?start=&end= (default last 30 days)"""
+    if not await ais_authenticated(request):
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
     
-    # Get historical data for charts
-    historical_stats = NetworkStats.objects.all()[:24]  # Last 24 entries
+    try:
+        start, end = parse_time_range(request, default=timedelta(days=30))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     
-    chart_data = {
-        'labels': [stat.timestamp.strftime('%H:%M') for stat in reversed(historical_stats)],
-        'uptime': [stat.uptime_percentage for stat in reversed(historical_stats)],
-        'interfaces_up': [stat.interfaces_up for stat in reversed(historical_stats)],
-        'interfaces_down': [stat.interfaces_down for stat in reversed(historical_stats)],
-    }
+    return JsonResponse(await sync_to_async(archived_series)(start, end, MAX_POINTS))
+
+
+def read_archived_logs(start, end, filters, limit):
+    """Up to `limit` archived log rows matching exact-value filters; True when more were left"""
+    rows = []
+    for row in read_archive('logs', start, end):
+        if all(row[field] == value for field, value in filters.items()):
+            if len(rows) == limit:
+                return rows, True
+            rows.append(row)
+    return rows, False
+
+
+@async_require_http_methods(["GET"])
+async def get_archived_logs(request):
+    """API endpoint to read archived logs, oldest first, filtered by device, interface and type"""
+    if not await ais_authenticated(request):
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
     
-    stats_data = {
-        'total_interfaces': total_interfaces,
-        'interfaces_up': interfaces_up,
-        'interfaces_down': interfaces_down,
-        'total_errors': total_errors,
-        'uptime_percentage': round(uptime_percentage, 2),
-        'chart_data': chart_data,
-    }
+    try:
+        start, end = parse_time_range(request, default=timedelta(days=30))
+        limit = parse_limit(request.GET.get('limit'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     
-    return JsonResponse(stats_data)
+    params = {'device': 'device', 'interface': 'interface_name', 'type': 'log_type'}
+    filters = {field: request.GET[param] for param, field in params.items() if request.GET.get(param)}
+    rows, truncated = await sync_to_async(read_archived_logs)(start, end, filters, limit)
+    
+    return JsonResponse({'logs': [serialize_log(NetworkLog(**row)) for row in rows], 'truncated': truncated})
 
 
 @require_http_methods(["POST"])
@@ -256,5 +405,18 @@ def clear_logs(request):
         return JsonResponse({'error': 'Unauthorized'}, status=401)
     
     NetworkLog.objects.all().delete()
+    invalidate_counters()
+    publish('logs_cleared', None)
     
     return JsonResponse({'success': True, 'message': 'All logs cleared'})
+
+
+@async_require_http_methods(["GET"])
+async def metrics(request):
+    """Prometheus metrics of this process, in the text exposition format"""
+    # Scrapers have no session; a bearer token guards the endpoint when configured
+    token = settings.METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)